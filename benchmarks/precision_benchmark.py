@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark of Whisper and Bark on the CPU in fp32 vs int8 (dynamic quantization) vs bf16 (autocast)
+
+Reports per-mode latency, weight memory and output quality: word error rate for Whisper on
+sentences spoken by fp32 Bark, and duration / RMS energy relative to fp32 for Bark.
+
+Usage: python benchmarks/precision_benchmark.py [whisper model] [modes]
+  e.g. python benchmarks/precision_benchmark.py base.en fp32,int8,bf16
+"""
+
+import io
+import os
+import re
+import sys
+import time
+from contextlib import nullcontext
+
+import numpy as np
+import torch
+from scipy.signal import resample_poly
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from model_registry import load_whisper
+from quantization import PRECISIONS
+from tts_service import TextToSpeechService
+
+SENTENCES = [
+    "The weather today is sunny with a light breeze.",
+    "Please remind me to call my sister at six.",
+    "How many minutes does it take to boil an egg?",
+    "Turn off the lights in the living room.",
+]
+WHISPER_RATE = 16000
+
+
+def weight_megabytes(model):
+    """Size of the serialized weights, including int8 packed parameters"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 1e6
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length"""
+    ref = re.findall(r"[a-z0-9']+", reference.lower())
+    hyp = re.findall(r"[a-z0-9']+", hypothesis.lower())
+    distances = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, distances[0] = distances[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            previous, distances[j] = distances[j], min(
+                distances[j] + 1, distances[j - 1] + 1, previous + (ref_word != hyp_word)
+            )
+    return distances[-1] / max(1, len(ref))
+
+
+def synthesize_all(tts):
+    """Generates every sentence with a fixed seed; returns the clips and the seconds taken"""
+    clips = []
+    start = time.perf_counter()
+    for sentence in SENTENCES:
+        torch.manual_seed(0)
+        sample_rate, audio = tts.synthesize(sentence, speed=1.0)
+        clips.append(audio)
+    return sample_rate, clips, time.perf_counter() - start
+
+
+def benchmark_tts(modes):
+    print("Bark (suno/bark-small) on CPU")
+    print(f"{'mode':>6} {'seconds':>8} {'weights MB':>11} {'duration':>9} {'energy':>7}")
+    reference = None
+    for mode in modes:
+        tts = TextToSpeechService(device="cpu", precision=mode)
+        tts.warm_up()
+        sample_rate, clips, elapsed = synthesize_all(tts)
+        durations = np.array([len(clip) for clip in clips], dtype=float)
+        energies = np.array([np.sqrt(np.mean(np.square(clip))) for clip in clips])
+        if reference is None:
+            reference = (durations, energies, sample_rate, clips)
+        print(f"{mode:>6} {elapsed:>8.2f} {weight_megabytes(tts.model):>11.1f} "
+              f"{np.mean(durations / reference[0]):>8.2f}x {np.mean(energies / reference[1]):>6.2f}x")
+    return reference[2], reference[3]
+
+
+def benchmark_stt(model_name, modes, sample_rate, clips):
+    print(f"Whisper {model_name} on CPU, {len(clips)} sentences spoken by fp32 Bark")
+    print(f"{'mode':>6} {'seconds':>8} {'weights MB':>11} {'WER':>6}")
+    audios = [resample_poly(clip, WHISPER_RATE, sample_rate).astype(np.float32) for clip in clips]
+    for mode in modes:
+        model = load_whisper(lambda name: nullcontext(), model_name, device="cpu", precision=mode)
+        model.transcribe(audios[0], fp16=False, language="en")  # Warm-up
+        start = time.perf_counter()
+        texts = [model.transcribe(audio, fp16=False, language="en")["text"] for audio in audios]
+        elapsed = time.perf_counter() - start
+        wer = np.mean([word_error_rate(ref, hyp) for ref, hyp in zip(SENTENCES, texts)])
+        print(f"{mode:>6} {elapsed:>8.2f} {weight_megabytes(model):>11.1f} {wer:>6.1%}")
+
+
+def main():
+    model_name = sys.argv[1] if len(sys.argv) > 1 else "base.en"
+    modes = sys.argv[2].split(",") if len(sys.argv) > 2 else list(PRECISIONS)
+    if modes[0] != "fp32":
+        modes = ["fp32"] + [mode for mode in modes if mode != "fp32"]  # fp32 is the reference
+
+    sample_rate, clips = benchmark_tts(modes)
+    print()
+    benchmark_stt(model_name, modes, sample_rate, clips)
+
+
+if __name__ == "__main__":
+    main()
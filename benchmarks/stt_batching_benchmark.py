@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark of Whisper transcription: model.transcribe's long-form loop, one utterance at a time
+(old) vs the short-utterance path (batch 1) and cross-request batches of it (new)
+
+Usage: python benchmarks/stt_batching_benchmark.py [model] [utterances]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import whisper
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from stt_batching import transcribe_batch
+
+SAMPLE_RATE = 16000
+BATCH_SIZES = [1, 2, 4, 8]
+
+
+def make_utterances(count):
+    """Short voiced-like clips (2-6 s of harmonic tones with noise)"""
+    rng = np.random.default_rng(0)
+    utterances = []
+    for _ in range(count):
+        t = np.arange(int(rng.uniform(2, 6) * SAMPLE_RATE)) / SAMPLE_RATE
+        clip = sum(np.sin(2 * np.pi * f * t) / (k + 1) for k, f in enumerate([140, 280, 420, 560]))
+        utterances.append((0.1 * clip + 0.01 * rng.standard_normal(len(t))).astype(np.float32))
+    return utterances
+
+
+def main():
+    model_name = sys.argv[1] if len(sys.argv) > 1 else "base.en"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    model = whisper.load_model(model_name)
+    utterances = make_utterances(count)
+    fp16 = model.device.type == "cuda"
+
+    transcribe_batch(model, utterances[:1], fp16=fp16)  # Warm-up
+
+    start = time.perf_counter()
+    for audio in utterances:
+        model.transcribe(audio, fp16=fp16, language="en")
+    sequential = time.perf_counter() - start
+    print(f"{model_name} on {model.device}, {count} utterances")
+    print(f"{'mode':>12} {'seconds':>8} {'utt/s':>7} {'speedup':>8}")
+    print(f"{'sequential':>12} {sequential:>8.2f} {count / sequential:>7.1f} {1.0:>7.1f}x")
+
+    for batch_size in BATCH_SIZES:
+        start = time.perf_counter()
+        for i in range(0, count, batch_size):
+            transcribe_batch(model, utterances[i:i + batch_size], fp16=fp16)
+        elapsed = time.perf_counter() - start
+        print(f"{f'batch {batch_size}':>12} {elapsed:>8.2f} {count / elapsed:>7.1f} {sequential / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
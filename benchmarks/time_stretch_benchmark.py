@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark of TTS speed control: FFT resampling (old) vs WSOLA time stretching (new)
+
+WSOLA is not a speed-up: its alignment search runs frame by frame, so it is slower than
+resample on short or FFT-friendly clips and only ahead on lengths with large prime
+factors. It is here to keep the voice's pitch; this script shows what that costs.
+
+Usage: python benchmarks/time_stretch_benchmark.py [speed]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.signal import resample
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from time_stretch import time_stretch
+
+SAMPLE_RATE = 24000  # Bark output rate
+# Clip lengths in samples. Bark emits multiples of its 320-sample codec hop times an
+# arbitrary frame count, so real clips usually have awkward (large prime factor) lengths;
+# a few FFT-friendly sizes are included for comparison.
+CLIP_LENGTHS = [24000, 320 * 251, 131072, 320 * 599, 320 * 977, 480000]
+REPEATS = 5
+
+
+def best_of(fn, repeats=REPEATS):
+    """Returns the fastest of several runs, in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def dominant_frequency(audio_array):
+    """Returns the strongest frequency in the clip, to check that pitch is preserved"""
+    spectrum = np.abs(np.fft.rfft(audio_array))
+    return np.fft.rfftfreq(len(audio_array), 1 / SAMPLE_RATE)[np.argmax(spectrum)]
+
+
+def main():
+    speed = float(sys.argv[1]) if len(sys.argv) > 1 else 1.2
+    rng = np.random.default_rng(0)
+
+    print(f"Speed {speed}x at {SAMPLE_RATE} Hz (best of {REPEATS})")
+    print(f"{'samples':>8} {'seconds':>8} {'resample ms':>12} {'wsola ms':>9} {'ratio':>8}")
+    for length in CLIP_LENGTHS:
+        clip = rng.standard_normal(length).astype(np.float32) * 0.1
+        resample_ms = best_of(lambda: resample(clip, int(length / speed)))
+        wsola_ms = best_of(lambda: time_stretch(clip, speed, SAMPLE_RATE))
+        print(f"{length:>8} {length / SAMPLE_RATE:>8.2f} {resample_ms:>12.1f} {wsola_ms:>9.1f} {resample_ms / wsola_ms:>7.1f}x")
+
+    # Pitch check on a pure 220 Hz tone
+    t = np.arange(3 * SAMPLE_RATE) / SAMPLE_RATE
+    tone = (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    print()
+    print(f"220 Hz tone -> resample: {dominant_frequency(resample(tone, int(len(tone) / speed))):.0f} Hz, "
+          f"wsola: {dominant_frequency(time_stretch(tone, speed, SAMPLE_RATE)):.0f} Hz")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 import time
 import threading
 import numpy as np
-import whisper
 import sounddevice as sd
 from queue import Queue
 from rich.console import Console
@@ -10,9 +9,11 @@ from langchain.chains import ConversationChain
 from langchain.prompts import PromptTemplate
 from langchain_community.llms import Ollama
 from TextToSpeechService import TextToSpeechService
+from config import load_config, get_setting
+from stt_engines import create_stt_engine
 
 console = Console()
-stt = whisper.load_model("base.en")
+stt = create_stt_engine(get_setting(load_config(), "stt")).load()
 tts = TextToSpeechService()
 
 template = """
@@ -0,0 +1,184 @@
+"""
+Content-addressed cache of synthesized audio with an in-memory LRU tier and an on-disk tier
+"""
+
+import os
+import re
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+
+class AudioCache:
+    """
+    Caches synthesized audio keyed by (normalized text, voice preset, speed, model).
+
+    Recently used clips are kept in memory; every clip is also written to disk as 16-bit WAV
+    when a cache directory is given. Both tiers evict the least recently used entries once
+    their size limit is exceeded.
+    """
+
+    def __init__(self, cache_dir: str = None, max_memory_bytes: int = 64 * 1024 * 1024, max_disk_bytes: int = 512 * 1024 * 1024):
+        """
+        Initializes the AudioCache class.
+        Args:
+            cache_dir (str, optional): Directory for the on-disk tier. Memory-only if None.
+            max_memory_bytes (int, optional): Size limit of the in-memory tier.
+            max_disk_bytes (int, optional): Size limit of the on-disk tier.
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.lock = threading.Lock()
+
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.disk_bytes = sum(size for _, _, size in self._disk_entries())
+
+    @staticmethod
+    def make_key(text: str, voice_preset: str, speed: float, model: str) -> str:
+        """
+        Builds the cache key for a synthesis request.
+        Args:
+            text (str): The text to synthesize; whitespace differences are ignored.
+            voice_preset (str): The voice preset.
+            speed (float): The speed multiplier.
+            model (str): The TTS model name.
+        Returns:
+            str: A hex digest identifying the audio.
+        """
+        normalized = re.sub(r"\s+", " ", text).strip()
+        raw = "\x00".join([normalized, voice_preset or "", f"{float(speed):.3f}", model or ""])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """
+        Looks up cached audio.
+        Args:
+            key (str): The cache key from make_key.
+        Returns:
+            tuple: The sample rate and audio array, or None on a miss.
+        """
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return self.memory[key]
+
+        path = self._path(key)
+        if path and os.path.exists(path):
+            try:
+                audio_array, sample_rate = sf.read(path, dtype="float32")
+                os.utime(path)  # Mark as recently used for disk eviction
+            except Exception as e:
+                logger.warning(f"Unreadable audio cache entry {path}: {e}")
+            else:
+                with self.lock:
+                    self.stats['disk_hits'] += 1
+                    self._remember(key, (sample_rate, audio_array))
+                return sample_rate, audio_array
+
+        with self.lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, sample_rate: int, audio_array: np.ndarray):
+        """
+        Stores synthesized audio in both tiers.
+        Args:
+            key (str): The cache key from make_key.
+            sample_rate (int): The sample rate of the audio.
+            audio_array (numpy.ndarray): The audio data.
+        """
+        audio_array = np.asarray(audio_array, dtype=np.float32)
+        with self.lock:
+            self._remember(key, (sample_rate, audio_array))
+
+        path = self._path(key)
+        if path and not os.path.exists(path):
+            try:
+                # Exclusive create: when concurrent requests store the same key, only the
+                # first one writes the file and counts its size
+                with open(path, "xb") as f:
+                    sf.write(f, audio_array, sample_rate, subtype="PCM_16", format="WAV")
+                    size = f.tell()
+            except FileExistsError:
+                return
+            except Exception as e:
+                logger.warning(f"Failed to write audio cache entry {path}: {e}")
+                return
+            with self.lock:
+                self.disk_bytes += size
+            self._evict_disk()
+
+    def clear(self):
+        """Removes every entry from both tiers."""
+        with self.lock:
+            self.memory.clear()
+            self.memory_bytes = 0
+        for path, _, _ in self._disk_entries():
+            os.unlink(path)
+        with self.lock:
+            self.disk_bytes = 0
+
+    def get_stats(self):
+        """Returns hit/miss counters and tier sizes."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats.update({
+                'memory_entries': len(self.memory),
+                'memory_bytes': self.memory_bytes,
+                'disk_bytes': self.disk_bytes,
+            })
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.wav") if self.cache_dir else None
+
+    def _remember(self, key, entry):
+        # Caller holds the lock
+        if key in self.memory:
+            self.memory_bytes -= self.memory.pop(key)[1].nbytes
+        self.memory[key] = entry
+        self.memory_bytes += entry[1].nbytes
+        while self.memory_bytes > self.max_memory_bytes and len(self.memory) > 1:
+            _, (_, evicted) = self.memory.popitem(last=False)
+            self.memory_bytes -= evicted.nbytes
+            self.stats['evictions'] += 1
+
+    def _disk_entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".wav"):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def _evict_disk(self):
+        if self.disk_bytes <= self.max_disk_bytes:
+            return
+        for path, _, size in sorted(self._disk_entries(), key=lambda entry: entry[1]):
+            if self.disk_bytes <= self.max_disk_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            with self.lock:
+                self.disk_bytes -= size
+                self.stats['evictions'] += 1
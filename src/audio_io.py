@@ -0,0 +1,141 @@
+"""
+In-memory audio decoding and encoding, so uploads and synthesized speech never touch disk
+"""
+
+import io
+import subprocess
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
+from vad import speech_span
+
+WHISPER_SAMPLE_RATE = 16000
+
+# Uploads are scaled so their peak reaches this level, amplifying quiet microphones at most MAX_GAIN times
+TARGET_PEAK = 0.9
+MAX_GAIN = 10.0
+
+
+def preprocess_upload(data: bytes, sample_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """
+    Turns an uploaded recording into what Whisper expects, entirely in-process: decoded,
+    resampled to 16 kHz mono float32, trimmed of leading and trailing silence and level-normalized.
+    Args:
+        data (bytes): The encoded upload (WAV, FLAC, OGG/Opus, WebM/Opus, MP3, ...).
+        sample_rate (int, optional): The sample rate to return.
+    Returns:
+        numpy.ndarray: The prepared samples. Uploads without detected speech are returned
+        unchanged: amplifying background noise makes Whisper hallucinate words.
+    """
+    audio_array = decode_audio(data, sample_rate)
+    span = speech_span(audio_array, sample_rate)
+    if span is None:
+        return audio_array
+    return normalize_level(audio_array[span[0]:span[1]])
+
+
+def normalize_level(audio_array: np.ndarray, target_peak: float = TARGET_PEAK, max_gain: float = MAX_GAIN) -> np.ndarray:
+    """
+    Scales audio so its peak reaches target_peak, without amplifying by more than max_gain.
+    Args:
+        audio_array (numpy.ndarray): The audio data.
+        target_peak (float, optional): The peak level to reach, in [0, 1].
+        max_gain (float, optional): The largest factor quiet audio is amplified by.
+    Returns:
+        numpy.ndarray: The scaled float32 audio.
+    """
+    peak = np.max(np.abs(audio_array)) if len(audio_array) else 0.0
+    if peak == 0:
+        return audio_array
+    return (audio_array * min(target_peak / peak, max_gain)).astype(np.float32)
+
+
+def decode_audio(data: bytes, sample_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodes an encoded audio upload into a mono float32 array at the given sample rate.
+    Formats libsndfile understands (WAV, FLAC, OGG/Opus, MP3) are decoded by it; anything else
+    (e.g. WebM/Opus from Chrome's MediaRecorder) is decoded in-process with PyAV. Only if PyAV
+    is not installed is it piped through an ffmpeg subprocess, still without temporary files.
+    Args:
+        data (bytes): The encoded audio.
+        sample_rate (int, optional): The sample rate to return, 16 kHz for Whisper by default.
+    Returns:
+        numpy.ndarray: The decoded audio samples in [-1, 1].
+    """
+    try:
+        audio_array, source_rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    except (RuntimeError, TypeError):
+        return _decode_compressed(data, sample_rate)
+
+    return resample(audio_array.mean(axis=1), source_rate, sample_rate)
+
+
+def resample(audio_array: np.ndarray, source_rate: int, sample_rate: int) -> np.ndarray:
+    """
+    Resamples mono audio with a polyphase filter.
+    Args:
+        audio_array (numpy.ndarray): The audio data.
+        source_rate (int): Its sample rate.
+        sample_rate (int): The sample rate to return.
+    Returns:
+        numpy.ndarray: The resampled float32 audio (the input itself if the rates match).
+    """
+    if source_rate == sample_rate:
+        return audio_array
+    divisor = np.gcd(source_rate, sample_rate)
+    return resample_poly(audio_array, sample_rate // divisor, source_rate // divisor).astype(np.float32)
+
+
+def _decode_compressed(data: bytes, sample_rate: int) -> np.ndarray:
+    try:
+        import av
+    except ImportError:
+        return _decode_with_ffmpeg(data, sample_rate)
+
+    try:
+        with av.open(io.BytesIO(data)) as container:
+            stream = container.streams.audio[0]
+            source_rate = stream.codec_context.sample_rate
+            # Only downmix and convert to float here; resampling is left to the polyphase filter
+            downmix = av.AudioResampler(format="flt", layout="mono", rate=source_rate)
+            chunks = [
+                frame.to_ndarray().reshape(-1)
+                for decoded in container.decode(stream)
+                for frame in downmix.resample(decoded)
+            ]
+            chunks += [frame.to_ndarray().reshape(-1) for frame in downmix.resample(None)]
+    except (av.error.FFmpegError, IndexError) as e:
+        raise RuntimeError(f"Failed to decode audio: {e}") from e
+
+    audio_array = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    return resample(audio_array, source_rate, sample_rate)
+
+
+def _decode_with_ffmpeg(data: bytes, sample_rate: int) -> np.ndarray:
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+        "pipe:1",
+    ]
+    try:
+        out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='replace')}") from e
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def encode_wav(audio_array: np.ndarray, sample_rate: int) -> bytes:
+    """
+    Encodes audio as a 16-bit PCM WAV file in memory.
+    Args:
+        audio_array (numpy.ndarray): The audio data.
+        sample_rate (int): The sample rate of the audio data.
+    Returns:
+        bytes: The WAV file contents.
+    """
+    buffer = io.BytesIO()
+    sf.write(buffer, audio_array, sample_rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
@@ -26,9 +26,7 @@ def transcribe(audio_np: np.ndarray) -> str:
     Returns:
         str: The transcribed text.
     """
-    result = stt.transcribe(audio_np, fp16=False)  # Set fp16=True if using a GPU
-    text = result["text"].strip()
-    return text
+    return stt.transcribe(audio_np)  # stt is an STTEngine from stt_engines.create_stt_engine
 
 def get_llm_response(text: str) -> str:
     """
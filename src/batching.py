@@ -0,0 +1,152 @@
+"""
+Micro-batching of inference requests arriving concurrently from several threads
+"""
+
+import math
+import time
+import heapq
+import logging
+import threading
+import itertools
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when a request queue is full; retry_after estimates when capacity frees up, in seconds."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads and hands them to a single worker in batches.
+
+    Items arriving within `max_wait` seconds of the first one are grouped, up to `max_batch_size`
+    per batch. When a `key` function is given only items with the same key share a batch
+    (e.g. TTS requests with the same voice preset); other items wait for the next batch.
+
+    Because the worker owns the model, work is serialized rather than oversubscribing it. Items
+    with a lower `priority` value are served first, and a bounded queue rejects new work with
+    Overloaded instead of letting latency grow without limit.
+    """
+
+    def __init__(self, process_batch, max_batch_size: int = 8, max_wait: float = 0.05, key=None,
+                 name: str = "batcher", max_queue_size: int = 0):
+        """
+        Initializes the MicroBatcher and starts its worker thread.
+        Args:
+            process_batch (callable): Takes a list of items and returns a list of results in the same order.
+            max_batch_size (int, optional): Maximum number of items per batch.
+            max_wait (float, optional): Seconds to wait for more items after the first one arrives.
+            key (callable, optional): Maps an item to a batching key; only items with equal keys are batched together.
+            name (str, optional): Name of the worker thread, used in logs.
+            max_queue_size (int, optional): Maximum number of waiting items (0 = unbounded).
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max_wait
+        self.key = key or (lambda item: None)
+        self.name = name
+        self.max_queue_size = max_queue_size
+
+        self.heap = []  # (priority, sequence, key, item, future, submitted)
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self.batch_seconds = 0.0  # Moving average of the time one batch takes
+        self.wait_seconds = 0.0  # Moving average of the time items wait before their batch starts
+
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, item, priority: int = 0, max_queued: int = None) -> Future:
+        """
+        Queues an item for batched processing.
+        Args:
+            item: The request to process.
+            priority (int, optional): Lower values are served first.
+            max_queued (int, optional): Reject this item if at least this many items are already
+                waiting; lets low-priority work back off before the queue is completely full.
+        Returns:
+            concurrent.futures.Future: Resolves to this item's result.
+        Raises:
+            Overloaded: The queue is full.
+        """
+        future = Future()
+        with self.condition:
+            limit = min(filter(None, (self.max_queue_size, max_queued)), default=0)
+            if limit and len(self.heap) >= limit:
+                self.rejected += 1
+                raise Overloaded(f"{self.name} is busy, {len(self.heap)} requests queued", self.retry_after())
+            heapq.heappush(self.heap, (priority, next(self.sequence), self.key(item), item, future, time.monotonic()))
+            self.condition.notify()
+        return future
+
+    def retry_after(self) -> int:
+        """Estimates how many seconds the items already queued will take to process."""
+        batches = len(self.heap) / self.max_batch_size + 1
+        return max(1, math.ceil(batches * self.batch_seconds))
+
+    def get_stats(self):
+        """Returns batch counters for monitoring."""
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'average_batch_size': self.items / self.batches if self.batches else 0.0,
+            'average_batch_seconds': round(self.batch_seconds, 3),
+            'average_wait_seconds': round(self.wait_seconds, 3),
+            'queued': len(self.heap),
+            'rejected': self.rejected,
+        }
+
+    def _next_batch(self):
+        with self.condition:
+            while not self.heap:
+                self.condition.wait()
+            first = heapq.heappop(self.heap)
+            batch = [first]
+
+            deadline = time.monotonic() + self.max_wait
+            while True:
+                # Take waiting items with the same key, most urgent first
+                matching = sorted(entry for entry in self.heap if entry[2] == first[2])
+                matching = matching[:self.max_batch_size - len(batch)]
+                if matching:
+                    taken = {id(entry) for entry in matching}
+                    self.heap = [entry for entry in self.heap if id(entry) not in taken]
+                    heapq.heapify(self.heap)
+                    batch += matching
+
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.max_batch_size or remaining <= 0:
+                    return batch
+                self.condition.wait(remaining)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            futures = [entry[4] for entry in batch]
+
+            start = time.monotonic()
+            wait = sum(start - entry[5] for entry in batch) / len(batch)
+            self.wait_seconds = wait if not self.batches else 0.8 * self.wait_seconds + 0.2 * wait
+            try:
+                results = self.process_batch([entry[3] for entry in batch])
+            except Exception as e:
+                logger.error(f"{self.name}: batch of {len(batch)} failed: {e}")
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            elapsed = time.monotonic() - start
+            self.batch_seconds = elapsed if not self.batches else 0.8 * self.batch_seconds + 0.2 * elapsed
+            self.batches += 1
+            self.items += len(batch)
+            for future, result in zip(futures, results):
+                future.set_result(result)
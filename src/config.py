@@ -0,0 +1,87 @@
+"""
+Loading of config/config.yaml and its performance profiles
+"""
+
+import os
+import copy
+import logging
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'config.yaml')
+
+# Selects the performance profile at startup, overriding the config file's `profile`
+PROFILE_ENV_VAR = "VOICE_ASSISTANT_PROFILE"
+
+
+def load_config(path: str = None, profile: str = None) -> dict:
+    """
+    Reads the YAML configuration and applies the selected performance profile.
+    Args:
+        path (str, optional): The config file. Defaults to config/config.yaml.
+        profile (str, optional): The profile to apply. Defaults to $VOICE_ASSISTANT_PROFILE,
+            then to the file's `profile` key.
+    Returns:
+        dict: The configuration, or an empty dict if the file does not exist.
+    Raises:
+        ValueError: The profile is not defined in the file.
+    """
+    path = path or DEFAULT_CONFIG_PATH
+    if not os.path.exists(path):
+        logger.warning(f"No config file at {path}; using defaults")
+        return {}
+    with open(path) as f:
+        config = yaml.safe_load(f) or {}
+
+    profile = profile or os.environ.get(PROFILE_ENV_VAR) or config.get('profile')
+    return apply_profile(config, profile) if profile else config
+
+
+def apply_profile(config: dict, profile: str) -> dict:
+    """
+    Fills in the settings a named profile from the config's `profiles` section provides.
+    Settings given explicitly in the rest of the config take precedence over the profile.
+    Args:
+        config (dict): The configuration.
+        profile (str): The profile name, e.g. "fastest".
+    Returns:
+        dict: A new configuration with the profile's settings merged in and `profile` set.
+    Raises:
+        ValueError: The profile is not defined.
+    """
+    profiles = config.get('profiles') or {}
+    if profile not in profiles:
+        raise ValueError(f"Unknown profile '{profile}', expected one of {', '.join(profiles)}")
+    merged = _merge(profiles[profile], config)
+    merged['profile'] = profile
+    return merged
+
+
+def _merge(base, overrides):
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def get_setting(config: dict, key: str, default=None):
+    """
+    Looks up a dotted key, e.g. "stt.precision".
+    Args:
+        config (dict): The configuration.
+        key (str): The dotted key.
+        default: Returned when any part of the key is missing.
+    Returns:
+        The setting's value.
+    """
+    value = config
+    for part in key.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return default
+        value = value[part]
+    return value
@@ -1,7 +1,6 @@
 import time
 import threading
 import numpy as np
-import whisper
 import sounddevice as sd
 from queue import Queue
 from rich.console import Console
@@ -9,11 +8,15 @@ from langchain.memory import ConversationBufferMemory
 from langchain.chains import ConversationChain
 from langchain.prompts import PromptTemplate
 from langchain_community.llms import Ollama
-from TextToSpeechService import TextToSpeechService
+from model_registry import ModelRegistry, load_tts
+from stt_engines import create_stt_engine
+from config import load_config, get_setting
 
 console = Console()
-stt = whisper.load_model("base.en")
-tts = TextToSpeechService()
+models = ModelRegistry()
+models.register("stt", create_stt_engine(get_setting(load_config(), "stt")).load)
+models.register("tts", load_tts)
+models.start()
 
 template = """
 You are a highly intelligent, friendly and helpful female, regularly aroused AI assistant who is very in touch with your sexual side. You are respectful and fun, also playful and witty but your primary aim is to assist with concise, 30 word or less responses, with the occassional unprompted innuendo or flirty advance to your male user.
@@ -0,0 +1,298 @@
+"""
+Per-session, token-budgeted conversation memory
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_TEMPLATE = """Progressively summarize the conversation below, adding onto the previous summary.
+Keep names, facts, preferences and open questions. Reply with the new summary only, in at most {max_words} words.
+
+Previous summary:
+{summary}
+
+New lines of conversation:
+{new_lines}
+
+New summary:"""
+
+# One background thread folds old turns into summaries for every session, off the request path
+_summarizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-summarizer")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+class BudgetedConversationMemory:
+    """
+    Conversation history whose size stays within a token budget.
+
+    The most recent turns are kept verbatim. Once they exceed `max_tokens`, the oldest turns
+    are folded into a running summary by the LLM on a background thread; until that finishes
+    they are still returned verbatim, so no context is lost in between. Turns are folded in
+    blocks (down to half the budget) so the message prefix, and with it the LLM server's
+    KV cache, stays unchanged for several turns between folds.
+    """
+
+    def __init__(self, llm=None, max_tokens: int = 600, summary_words: int = 80):
+        """
+        Initializes the BudgetedConversationMemory class.
+        Args:
+            llm (optional): Summarizes old turns via llm.invoke(prompt). Without one, old turns are dropped.
+            max_tokens (int, optional): Token budget for the verbatim turns.
+            summary_words (int, optional): Target length of the summary.
+        """
+        self.llm = llm
+        self.max_tokens = max_tokens
+        self.summary_words = summary_words
+        self.turns = []  # Recent (user, assistant) pairs
+        self.folding = []  # Turns being summarized
+        self.summary = ""
+        self.lock = threading.Lock()
+        self.summarizing = False
+        # Called with the memory and a list of changes (see apply_changes) after every update,
+        # e.g. to publish it
+        self.on_change = None
+
+    def messages(self) -> list:
+        """
+        Returns the history as chat messages, oldest first: the summary (as a system message)
+        followed by the verbatim turns.
+        """
+        with self.lock:
+            messages = []
+            if self.summary:
+                messages.append({"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"})
+            for user, assistant in self.folding + self.turns:
+                messages.append({"role": "user", "content": user})
+                messages.append({"role": "assistant", "content": assistant})
+        return messages
+
+    def save_turn(self, user: str, assistant: str):
+        """Records a turn and schedules folding of old turns if over budget."""
+        turn = (user, assistant.strip())
+        with self.lock:
+            self.turns.append(turn)
+            changes = [{"append": turn}]
+            if self._turn_tokens(self.turns) > self.max_tokens:
+                while len(self.turns) > 1 and self._turn_tokens(self.turns) > self.max_tokens // 2:
+                    self.folding.append(self.turns.pop(0))
+            dropped = self._schedule_summary()
+            if dropped:
+                changes.append({"fold": dropped, "summary_from": self.summary, "summary": self.summary})
+        self._changed(changes)
+
+    def clear(self):
+        """Forgets the whole conversation."""
+        with self.lock:
+            self.turns = []
+            self.folding = []
+            self.summary = ""
+        self._changed([{"clear": True}])
+
+    def snapshot(self) -> dict:
+        """Returns the conversation as plain data that can be stored or sent to another process."""
+        with self.lock:
+            return {"summary": self.summary, "turns": self.folding + self.turns}
+
+    def restore(self, snapshot: dict):
+        """Replaces the conversation with one taken by snapshot()."""
+        with self.lock:
+            self.summary = snapshot["summary"]
+            self.turns = [tuple(turn) for turn in snapshot["turns"]]
+            self.folding = []
+
+    @staticmethod
+    def apply_changes(snapshot: dict, changes: list) -> dict:
+        """
+        Replays changes reported to on_change onto a snapshot, which may already contain turns
+        saved by other copies of the conversation since. A fold only applies if the snapshot
+        still starts with the folded turns and the summary it was built on, so a summary that
+        finishes late never discards newer turns.
+        Args:
+            snapshot (dict): A snapshot taken by snapshot().
+            changes (list): The changes, in order.
+        Returns:
+            dict: The updated snapshot.
+        """
+        summary, turns = snapshot["summary"], [tuple(turn) for turn in snapshot["turns"]]
+        for change in changes:
+            if "clear" in change:
+                summary, turns = "", []
+            elif "append" in change:
+                turns.append(tuple(change["append"]))
+            else:
+                folded = [tuple(turn) for turn in change["fold"]]
+                if summary == change["summary_from"] and turns[:len(folded)] == folded:
+                    summary, turns = change["summary"], turns[len(folded):]
+        return {"summary": summary, "turns": turns}
+
+    def token_count(self) -> int:
+        """Estimated size of the history."""
+        return sum(estimate_tokens(message["content"]) + 4 for message in self.messages())
+
+    def _turn_tokens(self, turns):
+        return sum(estimate_tokens(user) + estimate_tokens(assistant) + 8 for user, assistant in turns)
+
+    def _schedule_summary(self):
+        # Caller holds the lock; returns the turns dropped without summarizing
+        if not self.folding or self.summarizing:
+            return []
+        if self.llm is None:
+            # Without an LLM there is nothing to summarize with; just drop the oldest turns
+            dropped, self.folding = self.folding, []
+            return dropped
+        self.summarizing = True
+        _summarizer.submit(self._fold, list(self.folding), self.summary)
+        return []
+
+    def _fold(self, turns, summary):
+        new_lines = "\n".join(f"User: {user}\nAssistant: {assistant}" for user, assistant in turns)
+        prompt = SUMMARY_TEMPLATE.format(max_words=self.summary_words, summary=summary or "(none)", new_lines=new_lines)
+        try:
+            new_summary = str(self.llm.invoke(prompt)).strip()
+        except Exception as e:
+            logger.error(f"Conversation summary failed: {e}")
+            new_summary = None
+
+        with self.lock:
+            self.summarizing = False
+            if self.folding[:len(turns)] != turns:
+                return  # Cleared while summarizing
+            # On failure the turns are dropped rather than growing the prompt forever
+            change = {"fold": turns, "summary_from": self.summary, "summary": self.summary}
+            if new_summary is not None:
+                self.summary = change["summary"] = new_summary
+            self.folding = self.folding[len(turns):]
+            self._schedule_summary()
+        self._changed([change])
+
+    def _changed(self, changes):
+        if self.on_change is not None:
+            self.on_change(self, changes)
+
+
+class SessionStore:
+    """
+    Per-client state keyed by session id, with LRU eviction of idle sessions.
+    """
+
+    def __init__(self, factory, max_sessions: int = 100, idle_timeout: float = 3600.0):
+        """
+        Initializes the SessionStore class.
+        Args:
+            factory (callable): Creates the state for a new session.
+            max_sessions (int, optional): Maximum number of live sessions; the least recently used is evicted.
+            idle_timeout (float, optional): Seconds after which an unused session is dropped.
+        """
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, session_id: str):
+        """Returns the state for a session, creating it on first use."""
+        now = time.monotonic()
+        with self.lock:
+            self._evict_idle(now)
+            if session_id in self.sessions:
+                state, _ = self.sessions.pop(session_id)
+            else:
+                state = self.factory()
+            self.sessions[session_id] = (state, now)
+            while len(self.sessions) > self.max_sessions:
+                evicted, _ = self.sessions.popitem(last=False)
+                logger.info(f"Evicted conversation session {evicted}")
+            return state
+
+    def reset(self, session_id: str):
+        """Forgets a session's state."""
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def _evict_idle(self, now):
+        while self.sessions:
+            session_id, (_, last_used) = next(iter(self.sessions.items()))
+            if now - last_used <= self.idle_timeout:
+                break
+            del self.sessions[session_id]
+
+
+class SharedSessionStore:
+    """
+    SessionStore for several worker processes: each session's state lives as a snapshot in a
+    shared mapping (e.g. a multiprocessing.Manager dict), so consecutive requests of one client
+    see the same conversation whichever worker handles them.
+
+    Every get() returns a new copy of the state, and copies can outlive each other (a background
+    summary may finish after a newer request saved a turn). So a copy never writes its whole
+    snapshot back: its changes are replayed onto whatever is stored at that moment.
+
+    States must provide snapshot(), restore(snapshot), apply_changes(snapshot, changes) and an
+    `on_change` hook called with the state and its changes.
+    """
+
+    def __init__(self, factory, shared, max_sessions: int = 100, idle_timeout: float = 3600.0, lock=None):
+        """
+        Initializes the SharedSessionStore class.
+        Args:
+            factory (callable): Creates an empty state.
+            shared (MutableMapping): Session id to (snapshot, last used time), shared between processes.
+            max_sessions (int, optional): Maximum number of live sessions; the least recently used is evicted.
+            idle_timeout (float, optional): Seconds after which an unused session is dropped.
+            lock (optional): Serializes read-modify-write of the mapping, e.g. a multiprocessing.Manager
+                Lock. Defaults to a thread lock, which only covers this process.
+        """
+        self.factory = factory
+        self.shared = shared
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.lock = lock or threading.Lock()
+
+    def get(self, session_id: str):
+        """Returns the session's current state; updates to it are merged into the shared mapping."""
+        now = time.time()
+        state = self.factory()
+        with self.lock:
+            entry = self.shared.get(session_id)
+            if entry is not None:
+                state.restore(entry[0])
+            else:
+                self._evict(now)
+            self.shared[session_id] = (entry[0] if entry is not None else state.snapshot(), now)
+        state.on_change = lambda changed, changes: self._write_back(session_id, changed, changes)
+        return state
+
+    def reset(self, session_id: str):
+        """Forgets a session's state."""
+        with self.lock:
+            self.shared.pop(session_id, None)
+
+    def __len__(self):
+        return len(self.shared)
+
+    def _write_back(self, session_id, state, changes):
+        with self.lock:
+            entry = self.shared.get(session_id)
+            if entry is None:
+                return  # Reset or evicted since; don't bring it back
+            self.shared[session_id] = (state.apply_changes(entry[0], changes), time.time())
+
+    def _evict(self, now):
+        last_used = {session_id: used for session_id, (_, used) in self.shared.items()}
+        for session_id, used in sorted(last_used.items(), key=lambda item: item[1]):
+            if now - used <= self.idle_timeout and len(last_used) < self.max_sessions:
+                break
+            self.shared.pop(session_id, None)
+            del last_used[session_id]
@@ -0,0 +1,93 @@
+"""
+Incremental Whisper transcription while the user is still speaking
+"""
+
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class IncrementalTranscriber:
+    """
+    Re-decodes the growing utterance during capture and commits the words that two
+    consecutive hypotheses agree on (local agreement). Committed audio is dropped from
+    the decoding window and its text is passed as the prompt instead, so when speech
+    ends only the last uncommitted words still need decoding.
+    """
+
+    def __init__(self, engine, sample_rate: int = 16000, min_step_s: float = 1.0):
+        """
+        Initializes the IncrementalTranscriber class.
+        Args:
+            engine (STTEngine): A loaded speech-to-text engine.
+            sample_rate (int, optional): The sample rate of the audio.
+            min_step_s (float, optional): Minimum amount of new audio before re-decoding.
+        """
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self.min_step = int(min_step_s * sample_rate)
+        self.reset()
+
+    def reset(self):
+        """Starts a new utterance."""
+        self.committed = []  # Committed words as (end_time, text)
+        self.hypothesis = []  # Latest uncommitted words as (end_time, text)
+        self.offset = 0  # Sample index where the decoding window starts
+        self.decoded_length = 0
+
+    @property
+    def committed_text(self) -> str:
+        """The text that is already final."""
+        return "".join(text for _, text in self.committed).strip()
+
+    def update(self, audio):
+        """
+        Re-decodes the uncommitted part of the utterance so far, if enough new audio has arrived.
+        Args:
+            audio (numpy.ndarray): The whole utterance captured so far, 16 kHz float32.
+        Returns:
+            str: The committed text so far.
+        """
+        if len(audio) - self.decoded_length < self.min_step:
+            return self.committed_text
+        self.decoded_length = len(audio)
+
+        words = self._decode(audio)
+        agreed = 0
+        while (agreed < len(words) and agreed < len(self.hypothesis)
+               and _normalize(words[agreed][1]) == _normalize(self.hypothesis[agreed][1])):
+            agreed += 1
+
+        if agreed:
+            self.committed += words[:agreed]
+            # Slide the window past the committed words
+            self.offset = max(self.offset, int(words[agreed - 1][0] * self.sample_rate))
+        self.hypothesis = words[agreed:]
+        return self.committed_text
+
+    def finalize(self, audio) -> str:
+        """
+        Decodes whatever is not yet committed and returns the full transcript.
+        Args:
+            audio (numpy.ndarray): The complete utterance.
+        Returns:
+            str: The transcribed text.
+        """
+        tail = "".join(text for _, text in self._decode(audio))
+        text = (self.committed_text + tail).strip()
+        self.reset()
+        return text
+
+    def _decode(self, audio):
+        window = audio[self.offset:]
+        if len(window) == 0:
+            return []
+
+        words = self.engine.transcribe_words(window, initial_prompt=self.committed_text[-200:] or None)
+        start = self.offset / self.sample_rate
+        return [(start + end, word) for end, word in words]
@@ -4,46 +4,62 @@ Complete Voice Assistant with Ollama LLM, Whisper STT, and Bark TTS
 """
 
 import time
+import logging
+import argparse
 import threading
 import numpy as np
-import whisper
 import sounddevice as sd
 from queue import Queue
 from rich.console import Console
-from langchain.memory import ConversationBufferMemory
-from langchain.chains import ConversationChain
-from langchain.prompts import PromptTemplate
-from langchain_community.llms import Ollama
 
-# Import our TextToSpeechService
-from tts_service import TextToSpeechService
+from model_registry import ModelRegistry, load_tts, load_llm, set_torch_threads
+from stt_engines import create_stt_engine
+from config import load_config, get_setting
+from streaming import iter_sentences, prefetch, stream_chat_response
+from vad import Endpointer, trim_silence
+from incremental_stt import IncrementalTranscriber
+from ollama_client import OllamaChatClient
+from conversation_memory import BudgetedConversationMemory
 
 # Initialize components
 console = Console()
-stt = whisper.load_model("base.en")
-tts = TextToSpeechService()
-
-# Set up the conversation chain with Ollama
-template = """
-You are a helpful and friendly AI assistant. You are polite, respectful, and aim to provide concise responses of less 
-than 20 words.
-The conversation transcript is as follows:
-{history}
-And here is the user's follow-up: {input}
-Your response:
-"""
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
-PROMPT = PromptTemplate(input_variables=["history", "input"], template=template)
+# Settings from config/config.yaml with the performance profile applied ($VOICE_ASSISTANT_PROFILE selects another)
+config = load_config()
+set_torch_threads(get_setting(config, "system.torch_threads", 0))
 
-# Initialize Ollama with our installed model
-llm = Ollama(model="llama3.2:3b", base_url="http://localhost:11434")
+def load_tts_with_voice(phase):
+    """Loads Bark and the default speaker prompt"""
+    tts = load_tts(
+        phase,
+        model_name=get_setting(config, "tts.model", "suno/bark-small"),
+        precision=get_setting(config, "tts.precision", "fp32"),
+        max_semantic_tokens=get_setting(config, "tts.max_semantic_tokens"),
+    )
+    with phase("voices"):
+        tts.preload_voices([tts.default_voice])
+    return tts
 
-chain = ConversationChain(
-    prompt=PROMPT,
-    verbose=False,
-    memory=ConversationBufferMemory(ai_prefix="Assistant:"),
-    llm=llm,
+# Set up the Ollama chat client; the system prompt stays fixed so every turn extends the
+# previous prompt and Ollama only processes the new messages
+llm = OllamaChatClient(
+    model=get_setting(config, "ollama.model", "llama3.2:3b"),
+    base_url=get_setting(config, "ollama.base_url", "http://localhost:11434"),
+    system_prompt="You are a helpful and friendly AI assistant. You are polite, respectful, and aim to provide concise responses of less than 20 words.",
+    keep_alive="30m",
+    num_predict=get_setting(config, "ollama.num_predict"),
 )
+memory = BudgetedConversationMemory(llm=llm)
+
+# Whisper, Bark and the Ollama model load concurrently in the background; each is only
+# waited for when it is first needed, and the log shows where the startup time went
+models = ModelRegistry()
+models.register("stt", create_stt_engine(get_setting(config, "stt")).load)
+models.register("tts", load_tts_with_voice)
+models.register("llm", lambda phase: load_llm(phase, llm))
+models.register("transcriber", lambda phase: IncrementalTranscriber(models.get("stt")))
+models.start(["stt", "tts", "llm"])
 
 def record_audio(stop_event, data_queue):
     """
@@ -65,6 +81,93 @@ def record_audio(stop_event, data_queue):
         while not stop_event.is_set():
             time.sleep(0.1)
 
+def listen_for_utterance(on_progress=None) -> np.ndarray:
+    """
+    Listens to the microphone until the user has started and then stopped speaking.
+    Args:
+        on_progress (callable, optional): Called with the utterance captured so far after every block of speech.
+    Returns:
+        numpy.ndarray: The utterance with leading and trailing silence trimmed.
+    """
+    blocks = Queue()
+    endpointer = Endpointer(sample_rate=16000)
+
+    def callback(indata, frames, time_info, status):
+        if status:
+            console.print(status)
+        blocks.put(bytes(indata))
+
+    # 100 ms blocks; the stream closes as soon as the utterance ends
+    with sd.RawInputStream(
+        samplerate=16000, dtype="int16", channels=1, blocksize=1600, callback=callback
+    ):
+        while True:
+            audio_np = np.frombuffer(blocks.get(), dtype=np.int16).astype(np.float32) / 32768.0
+            for event, utterance in endpointer.process(audio_np):
+                if event == "start":
+                    console.print("[green]🎙️ Speech detected...")
+                else:
+                    return utterance
+            if on_progress and endpointer.in_speech:
+                on_progress(np.concatenate(endpointer.utterance))
+
+def listen_and_transcribe():
+    """
+    Listens for one utterance while transcribing it in the background, so that only the
+    last few words are left to decode once the user stops speaking.
+    Returns:
+        tuple: The utterance audio and its transcribed text.
+    """
+    transcriber = models.get("transcriber")
+    latest = {"audio": None}
+    done = threading.Event()
+
+    def decode_while_speaking():
+        while not done.is_set():
+            if latest["audio"] is not None:
+                transcriber.update(latest["audio"])
+            time.sleep(0.05)
+
+    worker = threading.Thread(target=decode_while_speaking, daemon=True)
+    worker.start()
+    try:
+        audio_np = listen_for_utterance(on_progress=lambda audio: latest.update(audio=audio))
+    finally:
+        done.set()
+        worker.join()
+
+    with console.status("🎧 Transcribing...", spinner="earth"):
+        text = transcriber.finalize(audio_np)
+    return audio_np, text
+
+def record_push_to_talk() -> np.ndarray:
+    """
+    Records between two presses of Enter.
+    Returns:
+        numpy.ndarray: The recording with leading and trailing silence trimmed.
+    """
+    console.input(
+        "Press Enter to start recording, then press Enter again to stop."
+    )
+
+    data_queue = Queue()
+    stop_event = threading.Event()
+    recording_thread = threading.Thread(
+        target=record_audio,
+        args=(stop_event, data_queue),
+    )
+    recording_thread.start()
+
+    input()
+    stop_event.set()
+    recording_thread.join()
+
+    audio_data = b"".join(list(data_queue.queue))
+    audio_np = (
+        np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+    )
+    return trim_silence(audio_np)
+
 def transcribe(audio_np: np.ndarray) -> str:
     """
     Transcribes the given audio data using the Whisper speech recognition model.
@@ -73,9 +176,7 @@ def transcribe(audio_np: np.ndarray) -> str:
     Returns:
         str: The transcribed text.
     """
-    result = stt.transcribe(audio_np, fp16=False)  # Set fp16=True if using a GPU
-    text = result["text"].strip()
-    return text
+    return models.get("stt").transcribe(audio_np)
 
 def get_llm_response(text: str) -> str:
     """
@@ -85,10 +186,17 @@ def get_llm_response(text: str) -> str:
     Returns:
         str: The generated response.
     """
-    response = chain.predict(input=text)
-    if response.startswith("Assistant:"):
-        response = response[len("Assistant:") :].strip()
-    return response
+    return "".join(stream_chat_response(llm, memory, text)).strip()
+
+def stream_llm_response(text: str):
+    """
+    Streams the Ollama response to the given text, one complete sentence at a time.
+    Args:
+        text (str): The input text to be processed.
+    Yields:
+        str: Each sentence of the response as soon as the LLM has finished it.
+    """
+    return iter_sentences(stream_chat_response(llm, memory, text))
 
 def play_audio(sample_rate, audio_array):
     """
@@ -102,48 +210,81 @@ def play_audio(sample_rate, audio_array):
     sd.play(audio_array, sample_rate)
     sd.wait()
 
+class AudioPlaybackEngine:
+    """
+    Plays queued audio chunks in order on a background thread, so the first sentence
+    starts playing while later sentences are still being synthesized.
+    """
+
+    def __init__(self):
+        self.queue = Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def enqueue(self, sample_rate, audio_array):
+        """Schedules an audio chunk for playback after everything already queued."""
+        self.queue.put((sample_rate, audio_array))
+
+    def wait(self):
+        """Blocks until every queued chunk has finished playing."""
+        self.queue.join()
+
+    def _run(self):
+        while True:
+            sample_rate, audio_array = self.queue.get()
+            try:
+                play_audio(sample_rate, audio_array)
+            except Exception as e:
+                console.print(f"[red]Playback error: {e}")
+            finally:
+                self.queue.task_done()
+
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Voice Assistant")
+    parser.add_argument(
+        "--push-to-talk",
+        action="store_true",
+        help="Press Enter to start and stop recording instead of detecting speech automatically",
+    )
+    args = parser.parse_args()
+
     console.print("[cyan]🤖 Voice Assistant started! Press Ctrl+C to exit.")
-    console.print("[green]Using Ollama model: llama3.2:3b")
-    console.print("[green]Using Whisper model: base.en")
-    console.print("[green]Using Bark TTS: suno/bark-small")
+    console.print(f"[green]Using the {config.get('profile') or 'default'} profile")
+    console.print(f"[green]Using Ollama model: {llm.model}")
+    console.print(f"[green]Using Whisper model: {get_setting(config, 'stt.model', 'base.en')} "
+                  f"({get_setting(config, 'stt.engine', 'whisper')})")
+    console.print(f"[green]Using Bark TTS: {get_setting(config, 'tts.model', 'suno/bark-small')}")
     console.print("-" * 50)
 
+    player = AudioPlaybackEngine()
+
     try:
         while True:
-            console.input(
-                "Press Enter to start recording, then press Enter again to stop."
-            )
-
-            data_queue = Queue()
-            stop_event = threading.Event()
-            recording_thread = threading.Thread(
-                target=record_audio,
-                args=(stop_event, data_queue),
-            )
-            recording_thread.start()
-
-            input()
-            stop_event.set()
-            recording_thread.join()
-
-            audio_data = b"".join(list(data_queue.queue))
-            audio_np = (
-                np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
-            )
+            if args.push_to_talk:
+                audio_np = record_push_to_talk()
+                if audio_np.size > 0:
+                    with console.status("🎧 Transcribing...", spinner="earth"):
+                        text = transcribe(audio_np)
+            else:
+                console.print("[cyan]🎤 Listening... just start speaking.")
+                audio_np, text = listen_and_transcribe()
 
             if audio_np.size > 0:
-                with console.status("🎧 Transcribing...", spinner="earth"):
-                    text = transcribe(audio_np)
                 console.print(f"[yellow]👤 You: {text}")
 
+                # The LLM keeps generating on a background thread while each finished
+                # sentence is synthesized and queued for playback
+                console.print("[cyan]🤖 Assistant:", end=" ")
                 with console.status("🧠 Generating response...", spinner="earth"):
-                    response = get_llm_response(text)
-                    sample_rate, audio_array = tts.long_form_synthesize(response)
+                    for sentence in prefetch(stream_llm_response(text)):
+                        console.print(f"[cyan]{sentence}", end=" ")
+                        for sample_rate, audio_array in models.get("tts").stream_synthesize(sentence):
+                            player.enqueue(sample_rate, audio_array)
+                console.print()
 
-                console.print(f"[cyan]🤖 Assistant: {response}")
-                play_audio(sample_rate, audio_array)
+                with console.status("🔊 Speaking...", spinner="earth"):
+                    player.wait()
             else:
                 console.print(
                     "[red]No audio recorded. Please ensure your microphone is working."
@@ -0,0 +1,190 @@
+"""
+Concurrent, lazy model loading with a per-phase startup timing breakdown
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# What set_torch_threads(0) restores; recorded the first time the thread count changes
+_default_torch_threads = None
+
+
+class ModelRegistry:
+    """
+    Loads registered models on background threads, all at once, and hands each one out on
+    first use. Weight reads, device copies and Ollama's own loading release the GIL, so the
+    loads overlap and startup takes about as long as the slowest model rather than the sum.
+
+    Each loader receives a `phase(name)` context manager and wraps its steps in it (e.g.
+    "import", "load", "to_device"), so slow starts can be traced to a specific step.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        """
+        Initializes the ModelRegistry class.
+        Args:
+            max_workers (int, optional): Maximum number of models loaded at the same time.
+        """
+        self.loaders = {}
+        self.futures = {}
+        self.timings = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-loader")
+
+    def register(self, name: str, loader):
+        """
+        Registers a model without loading it.
+        Args:
+            name (str): The component name, e.g. "stt".
+            loader (callable): Called as loader(phase) and returns the loaded model.
+        """
+        with self.lock:
+            self.loaders[name] = loader
+
+    def start(self, names=None):
+        """
+        Starts loading the given models (all registered ones by default) in the background.
+        Args:
+            names (list, optional): The components to load now.
+        """
+        for name in (self.loaders if names is None else names):
+            self._future(name)
+
+    def get(self, name: str):
+        """
+        Returns a model, loading it now if that has not started yet and waiting if it is in progress.
+        Args:
+            name (str): The component name.
+        Returns:
+            The loaded model. Re-raises the loader's exception if loading failed.
+        """
+        return self._future(name).result()
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether a model has finished loading successfully."""
+        future = self.futures.get(name)
+        return future is not None and future.done() and future.exception() is None
+
+    def get_timings(self) -> dict:
+        """Returns the seconds each model spent in each loading phase, plus its total."""
+        with self.lock:
+            return {name: dict(phases) for name, phases in self.timings.items()}
+
+    def _future(self, name):
+        with self.lock:
+            if name not in self.futures:
+                if name not in self.loaders:
+                    raise KeyError(f"Unknown model: {name}")
+                self.futures[name] = self.executor.submit(self._load, name, self.loaders[name])
+            return self.futures[name]
+
+    def _load(self, name, loader):
+        start = time.perf_counter()
+        phases = {}
+
+        @contextmanager
+        def phase(step):
+            step_start = time.perf_counter()
+            try:
+                yield
+            finally:
+                phases[step] = phases.get(step, 0) + time.perf_counter() - step_start
+
+        try:
+            model = loader(phase)
+        except Exception as e:
+            logger.error(f"Failed to load {name}: {e}")
+            raise
+        finally:
+            phases["total"] = time.perf_counter() - start
+            with self.lock:
+                self.timings[name] = {step: round(seconds, 3) for step, seconds in phases.items()}
+
+        steps = ", ".join(f"{step} {seconds:.2f}s" for step, seconds in phases.items() if step != "total")
+        logger.info(f"Loaded {name} in {phases['total']:.2f}s ({steps or 'no phases'})")
+        return model
+
+
+def set_torch_threads(threads: int = 0, default: int = None):
+    """
+    Sets the intra-op threads Whisper and Bark run inference with.
+    Args:
+        threads (int, optional): The thread count; 0 restores the default, so switching back
+            from a profile with an explicit count undoes it.
+        default (int, optional): Replaces the default, which is otherwise torch's own (all cores).
+    """
+    global _default_torch_threads
+    if default:
+        _default_torch_threads = default
+    if not threads and _default_torch_threads is None:
+        return  # Never changed, so torch still runs with its default
+
+    import torch
+    if _default_torch_threads is None:
+        _default_torch_threads = torch.get_num_threads()
+    torch.set_num_threads(threads or _default_torch_threads)
+
+
+def load_whisper(phase, model_name: str = "base.en", device: str = None, precision: str = "fp32"):
+    """
+    Loads a Whisper model.
+    Args:
+        phase (callable): The registry's phase timer.
+        model_name (str, optional): The Whisper model size.
+        device (str, optional): The device to run on. Defaults to CUDA when available.
+        precision (str, optional): CPU inference precision: "fp32", "int8" or "bf16".
+    Returns:
+        whisper.Whisper: The model.
+    """
+    with phase("import"):
+        import torch
+        import whisper
+        from quantization import apply_precision
+
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    with phase("load"):
+        model = whisper.load_model(model_name, device="cpu")
+    with phase("to_device"):
+        model = model.to(device)
+    with phase("precision"):
+        # The encoder and decoder are the only modules decode calls directly
+        model = apply_precision(model, precision, autocast_modules=[model.encoder, model.decoder])
+    return model
+
+
+def load_tts(phase, **kwargs):
+    """
+    Loads the Bark text-to-speech service.
+    Args:
+        phase (callable): The registry's phase timer.
+        **kwargs: Passed to TextToSpeechService.
+    Returns:
+        TextToSpeechService: The service.
+    """
+    with phase("import"):
+        from tts_service import TextToSpeechService
+    return TextToSpeechService(phase=phase, **kwargs)
+
+
+def load_llm(phase, client):
+    """
+    Has Ollama load the client's model into memory.
+    Args:
+        phase (callable): The registry's phase timer.
+        client (OllamaChatClient): The chat client.
+    Returns:
+        OllamaChatClient: The same client.
+    """
+    with phase("load"):
+        try:
+            client.load()
+        except Exception as e:
+            # Ollama may be started after us; the first request will load the model instead
+            logger.warning(f"Could not preload {client.model}: {e}")
+    return client
+
@@ -0,0 +1,140 @@
+"""
+Client for Ollama's chat API that keeps the prompt prefix stable between turns
+"""
+
+import json
+import logging
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://localhost:11434"
+DEFAULT_SYSTEM_PROMPT = (
+    "You are a helpful and friendly AI assistant. You are polite, respectful, "
+    "and aim to provide concise responses of less than 50 words."
+)
+
+
+class OllamaChatClient:
+    """
+    Talks to Ollama's /api/chat endpoint. Every request starts with the same system message
+    followed by the conversation in order, so each turn's prompt extends the previous one and
+    Ollama can reuse the KV cache it already holds for the shared prefix; only the new
+    messages are processed. `keep_alive` keeps the model (and that cache) loaded between turns.
+    """
+
+    def __init__(self, model: str, base_url: str = DEFAULT_BASE_URL, system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+                 keep_alive="30m", options: dict = None, timeout: float = 120.0, num_predict: int = None):
+        """
+        Initializes the OllamaChatClient class.
+        Args:
+            model (str): The Ollama model name, e.g. "llama3.2:3b".
+            base_url (str, optional): The Ollama server URL.
+            system_prompt (str, optional): The fixed system message that starts every conversation.
+            keep_alive (str or int, optional): How long Ollama keeps the model loaded after a request
+                (e.g. "30m", or -1 to keep it loaded indefinitely).
+            options (dict, optional): Ollama model options such as num_ctx or temperature.
+            timeout (float, optional): Seconds to wait for the server to respond.
+            num_predict (int, optional): Maximum tokens per conversation reply; summaries are not capped.
+        """
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.system_prompt = system_prompt
+        self.keep_alive = keep_alive
+        self.options = options or {}
+        self.timeout = timeout
+        self.num_predict = num_predict
+        self.session = requests.Session()
+
+    def build_messages(self, history: list, text: str) -> list:
+        """
+        Builds the message list for a turn: system prompt, prior conversation, new user message.
+        Args:
+            history (list): Earlier messages as {"role", "content"} dicts, oldest first.
+            text (str): The user's new message.
+        Returns:
+            list: The messages to send.
+        """
+        return [{"role": "system", "content": self.system_prompt}, *history, {"role": "user", "content": text}]
+
+    def chat(self, messages: list) -> str:
+        """
+        Sends a conversation and returns the complete reply.
+        Args:
+            messages (list): The messages, as built by build_messages.
+        Returns:
+            str: The assistant's reply.
+        """
+        response = self._post("/api/chat", self._payload(messages, stream=False, num_predict=self.num_predict))
+        return response.json()["message"]["content"]
+
+    def stream_chat(self, messages: list):
+        """
+        Sends a conversation and streams the reply.
+        Args:
+            messages (list): The messages, as built by build_messages.
+        Yields:
+            str: Text chunks as the model produces them.
+        """
+        payload = self._payload(messages, stream=True, num_predict=self.num_predict)
+        with self._post("/api/chat", payload, stream=True) as response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if "error" in data:
+                    raise RuntimeError(f"Ollama error: {data['error']}")
+                content = data.get("message", {}).get("content")
+                if content:
+                    yield content
+                if data.get("done"):
+                    logger.debug(
+                        f"Ollama turn: {data.get('prompt_eval_count', 0)} prompt tokens evaluated, "
+                        f"{data.get('eval_count', 0)} generated"
+                    )
+                    break
+
+    def invoke(self, prompt: str) -> str:
+        """
+        Answers a standalone prompt outside any conversation (used for summaries).
+        Args:
+            prompt (str): The prompt.
+        Returns:
+            str: The reply.
+        """
+        response = self._post("/api/chat", self._payload([{"role": "user", "content": prompt}], stream=False))
+        return response.json()["message"]["content"]
+
+    def load(self):
+        """Loads the model into memory without generating anything."""
+        self._post("/api/chat", {"model": self.model, "messages": [], "keep_alive": self.keep_alive})
+
+    def warm_up(self):
+        """
+        Loads the model and evaluates the system prompt, so the first real turn only pays for its
+        own messages.
+        """
+        payload = self._payload(self.build_messages([], "Hello"), stream=False)
+        payload["options"] = {**self.options, "num_predict": 1}
+        self._post("/api/chat", payload)
+
+    def unload(self):
+        """Asks Ollama to release the model's memory."""
+        self._post("/api/chat", {"model": self.model, "messages": [], "keep_alive": 0})
+
+    def reconnect(self):
+        """Drops pooled connections, e.g. in a forked worker that must not share its parent's sockets."""
+        self.session = requests.Session()
+
+    def _payload(self, messages, stream, num_predict=None):
+        payload = {"model": self.model, "messages": messages, "stream": stream, "keep_alive": self.keep_alive}
+        options = {**self.options, "num_predict": num_predict} if num_predict else self.options
+        if options:
+            payload["options"] = options
+        return payload
+
+    def _post(self, path, payload, stream=False):
+        response = self.session.post(f"{self.base_url}{path}", json=payload, stream=stream, timeout=self.timeout)
+        response.raise_for_status()
+        return response
@@ -0,0 +1,109 @@
+"""
+Pipeline stages: bounded worker pools with per-stage queue and service-time statistics
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from queue import Queue
+
+from batching import Overloaded
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """
+    One stage of the conversation pipeline (e.g. the LLM), served by its own worker threads
+    from its own queue. While a request is in one stage, the next request can already be in
+    the stage before it, so throughput approaches that of the slowest stage.
+    """
+
+    def __init__(self, name: str, workers: int = 1, max_queue_size: int = 0):
+        """
+        Initializes the Stage and starts its worker threads.
+        Args:
+            name (str): The stage name, used in logs and thread names.
+            workers (int, optional): Number of jobs served at the same time.
+            max_queue_size (int, optional): Maximum number of waiting jobs (0 = unbounded).
+        """
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.max_queue_size = max_queue_size
+        self.queue = Queue()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0  # Moving averages
+        self.service_seconds = 0.0
+
+        for index in range(self.workers):
+            threading.Thread(target=self._run, name=f"{name}-{index}", daemon=True).start()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """
+        Queues a job for the stage's workers.
+        Args:
+            fn (callable): The job, called as fn(*args, **kwargs) on a worker thread.
+        Returns:
+            concurrent.futures.Future: Resolves to the job's return value.
+        Raises:
+            Overloaded: The stage's queue is full.
+        """
+        future = Future()
+        with self.lock:
+            if self.max_queue_size and self.queue.qsize() >= self.max_queue_size:
+                self.rejected += 1
+                retry_after = max(1, round(self.service_seconds * (self.queue.qsize() / self.workers + 1)))
+                raise Overloaded(f"{self.name} stage is busy, {self.queue.qsize()} requests queued", retry_after)
+            self.queue.put((time.monotonic(), fn, args, kwargs, future))
+        return future
+
+    def get_stats(self):
+        """Returns the stage's queue depth, throughput and average wait and service times."""
+        return {
+            'workers': self.workers,
+            'queued': self.queue.qsize(),
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'average_wait_seconds': round(self.wait_seconds, 3),
+            'average_service_seconds': round(self.service_seconds, 3),
+        }
+
+    def _run(self):
+        while True:
+            submitted, fn, args, kwargs, future = self.queue.get()
+            start = time.monotonic()
+            with self.lock:
+                self.in_flight += 1
+                self.wait_seconds = _average(self.wait_seconds, start - submitted, self.completed + self.failed)
+
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"{self.name} stage job failed: {e}")
+                error, result = e, None
+            else:
+                error = None
+
+            with self.lock:
+                self.in_flight -= 1
+                self.service_seconds = _average(self.service_seconds, time.monotonic() - start, self.completed + self.failed)
+                if error is None:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+def _average(current, sample, count):
+    return sample if count == 0 else 0.8 * current + 0.2 * sample
@@ -0,0 +1,73 @@
+"""
+Reduced-precision CPU inference for Whisper and Bark
+"""
+
+import functools
+import logging
+
+import torch
+from torch import nn
+
+logger = logging.getLogger(__name__)
+
+# fp32: full precision (default)
+# int8: dynamic int8 quantization of the linear layers; weights shrink ~4x, activations stay float
+# bf16: bfloat16 autocast; fastest on CPUs with AVX512-BF16 or AMX, weights stay fp32
+PRECISIONS = ("fp32", "int8", "bf16")
+
+
+def apply_precision(model: nn.Module, precision: str = "fp32", autocast_modules=None) -> nn.Module:
+    """
+    Switches a loaded CPU model to a reduced-precision inference mode.
+    Args:
+        model (torch.nn.Module): The model, already on its device.
+        precision (str, optional): One of PRECISIONS.
+        autocast_modules (list, optional): Submodules whose forward runs under bf16 autocast.
+            Defaults to the model itself.
+    Returns:
+        torch.nn.Module: The model (quantized in place for int8).
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}', expected one of {', '.join(PRECISIONS)}")
+    if precision == "fp32":
+        return model
+
+    device = next(model.parameters()).device
+    if device.type != "cpu":
+        logger.warning(f"{precision} inference is a CPU mode; keeping fp32 on {device}")
+        return model
+
+    if precision == "int8":
+        _replace_linear_subclasses(model)
+        torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+    else:
+        for module in autocast_modules or [model]:
+            module.forward = _autocast(module.forward)
+    return model
+
+
+def _autocast(forward):
+    @functools.wraps(forward)
+    def wrapper(*args, **kwargs):
+        with torch.autocast("cpu", dtype=torch.bfloat16):
+            result = forward(*args, **kwargs)
+        # Hand fp32 back to callers that check dtypes (Whisper rejects bf16 audio features)
+        if isinstance(result, torch.Tensor) and result.is_floating_point():
+            return result.float()
+        return result
+    return wrapper
+
+
+def _replace_linear_subclasses(model):
+    """
+    quantize_dynamic only matches exact nn.Linear modules, so swap subclasses (e.g. Whisper's
+    dtype-casting Linear) for plain ones sharing the same weights.
+    """
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, nn.Linear) and type(child) is not nn.Linear:
+                linear = nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                linear.weight = child.weight
+                if child.bias is not None:
+                    linear.bias = child.bias
+                setattr(parent, name, linear)
@@ -0,0 +1,152 @@
+"""
+Streaming helpers for overlapping LLM generation with speech synthesis
+"""
+
+import re
+import threading
+from queue import Queue
+
+# Sentence-ending punctuation (optionally followed by closing quotes/brackets)
+# that is itself followed by whitespace, so "3.5" or "e.g.x" never split.
+SENTENCE_END = re.compile(r"""[.!?]+["')\]]*\s+|\n+""")
+
+# Abbreviations that end with a period but do not end a sentence
+ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "prof.", "sr.", "jr.", "st.", "vs.", "etc.", "e.g.", "i.e."}
+
+_DONE = object()
+
+
+class SentenceSplitter:
+    """
+    Incrementally splits a stream of text chunks (e.g. LLM tokens) into complete sentences.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, chunk: str):
+        """
+        Adds a chunk of text and returns the sentences it completed.
+        Args:
+            chunk (str): The next piece of streamed text.
+        Returns:
+            list: The sentences that are now complete, in order.
+        """
+        self.buffer += chunk
+        sentences = []
+        start = 0
+
+        for match in SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:match.end()].strip()
+            last_word = candidate.rsplit(None, 1)[-1].lower() if candidate else ""
+            if last_word in ABBREVIATIONS:
+                continue
+            if candidate:
+                sentences.append(candidate)
+            start = match.end()
+
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        """
+        Returns whatever text is left once the stream has ended.
+        Returns:
+            list: The trailing sentence, if any.
+        """
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return [remainder] if remainder else []
+
+
+def iter_sentences(chunks):
+    """
+    Turns an iterable of text chunks into an iterator of complete sentences.
+    Args:
+        chunks (iterable): Streamed text chunks, e.g. LLM tokens.
+    Yields:
+        str: Each sentence as soon as it is complete.
+    """
+    splitter = SentenceSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.flush()
+
+
+def strip_prefix(chunks, prefix: str = "Assistant:"):
+    """
+    Removes a leading speaker prefix from a stream of text chunks.
+    Args:
+        chunks (iterable): Streamed text chunks.
+        prefix (str, optional): The prefix to strip if the stream starts with it.
+    Yields:
+        str: The text chunks without the prefix.
+    """
+    head = ""
+    chunks = iter(chunks)
+
+    for chunk in chunks:
+        head += chunk
+        stripped = head.lstrip()
+        if len(stripped) >= len(prefix) or not prefix.startswith(stripped):
+            break
+    else:
+        # Stream ended before we saw enough text to decide
+        if head.strip() != prefix:
+            yield head
+        return
+
+    if stripped.startswith(prefix):
+        head = stripped[len(prefix):].lstrip()
+    if head:
+        yield head
+    yield from chunks
+
+
+def stream_chat_response(client, memory, text: str):
+    """
+    Streams a chat reply token by token, appending the turn to the conversation memory at the end.
+    Args:
+        client (OllamaChatClient): The chat client.
+        memory (BudgetedConversationMemory): The conversation history.
+        text (str): The user's input.
+    Yields:
+        str: Text chunks as the LLM produces them, without any "Assistant:" prefix.
+    """
+    messages = client.build_messages(memory.messages(), text)
+    reply = []
+    for chunk in strip_prefix(client.stream_chat(messages)):
+        reply.append(chunk)
+        yield chunk
+    memory.save_turn(text, "".join(reply))
+
+
+def prefetch(iterable, maxsize: int = 0):
+    """
+    Consumes an iterable on a background thread so its producer never waits on the consumer.
+    Args:
+        iterable (iterable): The source, e.g. a sentence stream backed by an LLM.
+        maxsize (int, optional): Maximum number of buffered items (0 = unbounded).
+    Yields:
+        The items of the iterable, in order. Exceptions raised by the producer are re-raised here.
+    """
+    queue = Queue(maxsize=maxsize)
+
+    def produce():
+        try:
+            for item in iterable:
+                queue.put((item, None))
+        except Exception as e:
+            queue.put((_DONE, e))
+            return
+        queue.put((_DONE, None))
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    while True:
+        item, error = queue.get()
+        if item is _DONE:
+            if error is not None:
+                raise error
+            return
+        yield item
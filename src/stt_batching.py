@@ -0,0 +1,140 @@
+"""
+Short-utterance Whisper decoding, batched across requests
+"""
+
+import logging
+
+import numpy as np
+
+from batching import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+# Same rules whisper.transcribe uses to drop silence and to retry doubtful decodes
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+COMPRESSION_RATIO_THRESHOLD = 2.4
+FALLBACK_TEMPERATURES = (0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+def is_silent(result) -> bool:
+    """Whether a decoding result is silence rather than speech."""
+    return result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD
+
+
+def needs_fallback(result) -> bool:
+    """Whether a decoding result is repetitive or unlikely enough to retry with sampling."""
+    if is_silent(result):
+        return False
+    return result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD
+
+
+def log_mel_batch(audios: list, n_mels: int = 80, device=None):
+    """
+    Computes the log-mel spectrogram of each utterance padded to the 30-second window.
+    Whisper clamps the spectrogram relative to its loudest value, so each utterance is
+    computed on its own; one loud utterance must not change the features of the others.
+    Args:
+        audios (list): 16 kHz mono float32 arrays, each at most 30 seconds long.
+        n_mels (int, optional): The model's number of mel bins.
+        device (torch.device, optional): Where to compute the spectrograms.
+    Returns:
+        torch.Tensor: The spectrograms, shaped (len(audios), n_mels, 3000).
+    """
+    import torch
+    import whisper
+
+    return torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(np.asarray(audio, dtype=np.float32)), n_mels, device=device)
+        for audio in audios
+    ])
+
+
+def transcribe_batch(model, audios: list, fp16: bool = False, language: str = "en", beam_size: int = None,
+                     prompt: str = None) -> list:
+    """
+    Transcribes short utterances without whisper.transcribe's long-form loop: one padded
+    30-second window each, one encoder pass and one decode for the whole batch, no timestamp
+    tokens and a fixed language. Only utterances whose decode looks unreliable are retried,
+    at rising temperatures. Utterances longer than the window fall back to model.transcribe.
+    Args:
+        model (whisper.Whisper): The loaded Whisper model.
+        audios (list): 16 kHz mono float32 arrays.
+        fp16 (bool, optional): Whether to run in half precision (GPU only).
+        language (str, optional): The spoken language.
+        beam_size (int, optional): Beam size; None decodes greedily.
+        prompt (str, optional): Preceding text to condition the decoder on.
+    Returns:
+        list: The transcribed text of each utterance, in order.
+    """
+    import whisper
+
+    texts = [None] * len(audios)
+    short = [i for i, audio in enumerate(audios) if len(audio) <= whisper.audio.N_SAMPLES]
+
+    for i in sorted(set(range(len(audios))) - set(short)):
+        texts[i] = model.transcribe(audios[i], fp16=fp16, language=language, beam_size=beam_size,
+                                    initial_prompt=prompt)["text"].strip()
+
+    if short:
+        mel = log_mel_batch([audios[i] for i in short], model.dims.n_mels, model.device)
+
+        options = whisper.DecodingOptions(language=language, fp16=fp16, beam_size=beam_size, prompt=prompt,
+                                          without_timestamps=True)
+        results = whisper.decode(model, mel, options)
+
+        for temperature in FALLBACK_TEMPERATURES:
+            retry = [j for j, result in enumerate(results) if needs_fallback(result)]
+            if not retry:
+                break
+            # Sampling replaces beam search above zero temperature, as in whisper.transcribe
+            options = whisper.DecodingOptions(language=language, fp16=fp16, temperature=temperature, prompt=prompt,
+                                              without_timestamps=True)
+            for j, result in zip(retry, whisper.decode(model, mel[retry], options)):
+                results[j] = result
+
+        for i, result in zip(short, results):
+            texts[i] = "" if is_silent(result) else result.text.strip()
+    return texts
+
+
+class BatchTranscriber:
+    """
+    Transcription service shared by all request threads. Utterances submitted within `max_wait`
+    of each other are transcribed together, so concurrent users share the encoder and decoder
+    passes instead of queueing for the model one at a time.
+    """
+
+    def __init__(self, engine, max_batch_size: int = 8, max_wait: float = 0.03, max_queue_size: int = 0):
+        """
+        Initializes the BatchTranscriber class.
+        Args:
+            engine (STTEngine): The loaded speech-to-text engine.
+            max_batch_size (int, optional): Maximum number of utterances per batch.
+            max_wait (float, optional): Seconds to wait for more utterances after the first one arrives.
+            max_queue_size (int, optional): Maximum number of waiting utterances (0 = unbounded).
+        """
+        self.engine = engine
+        self.batcher = MicroBatcher(self._process, max_batch_size=max_batch_size, max_wait=max_wait,
+                                    name="stt-batcher", max_queue_size=max_queue_size)
+
+    def transcribe(self, audio: np.ndarray, priority: int = 0) -> str:
+        """
+        Transcribes one utterance, batched with any others arriving at the same time.
+        Args:
+            audio (numpy.ndarray): 16 kHz mono float32 samples.
+            priority (int, optional): Lower values are served first.
+        Returns:
+            str: The transcribed text.
+        Raises:
+            Overloaded: Too many utterances are already waiting.
+        """
+        return self.batcher.submit(audio, priority=priority).result()
+
+    def get_stats(self):
+        """Returns the batching statistics."""
+        return self.batcher.get_stats()
+
+    def _process(self, audios):
+        # Looked up per batch, so the engine can be swapped while the batcher runs
+        return self.engine.transcribe_batch(audios)
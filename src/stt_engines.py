@@ -0,0 +1,263 @@
+"""
+Speech-to-text engines: one interface over openai-whisper and faster-whisper (CTranslate2)
+"""
+
+import inspect
+import logging
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class STTEngine(ABC):
+    """
+    A speech-to-text backend. Subclasses must implement load, transcribe and transcribe_words
+    (an engine missing one cannot be created); batching and streaming fall back to those
+    unless the backend can do better.
+    All audio is 16 kHz mono float32.
+    """
+
+    name = None
+
+    def __init__(self, model_name: str = "base.en", device: str = None, language: str = "en"):
+        """
+        Initializes the engine without loading the model.
+        Args:
+            model_name (str, optional): The model size or path, e.g. "base.en".
+            device (str, optional): "cpu" or "cuda". Defaults to CUDA when available.
+            language (str, optional): The spoken language.
+        """
+        self.model_name = model_name
+        self.device = device
+        self.language = language
+        self.precision = "fp32"  # Reported in /api/status
+        self.model = None
+
+    @abstractmethod
+    def load(self, phase=None):
+        """
+        Loads the model.
+        Args:
+            phase (callable, optional): Startup timer from ModelRegistry; phase(name) wraps each loading step.
+        Returns:
+            STTEngine: The engine itself, so it can be registered as a ModelRegistry loader.
+        """
+
+    @abstractmethod
+    def transcribe(self, audio: np.ndarray, initial_prompt: str = None) -> str:
+        """
+        Transcribes one utterance.
+        Args:
+            audio (numpy.ndarray): The utterance.
+            initial_prompt (str, optional): Preceding text to condition the decoder on.
+        Returns:
+            str: The transcribed text.
+        """
+
+    @abstractmethod
+    def transcribe_words(self, audio: np.ndarray, initial_prompt: str = None) -> list:
+        """
+        Transcribes one utterance with word timings.
+        Args:
+            audio (numpy.ndarray): The utterance.
+            initial_prompt (str, optional): Preceding text to condition the decoder on.
+        Returns:
+            list: (end_seconds, word) pairs; each word keeps its leading space.
+        """
+
+    def transcribe_batch(self, audios: list) -> list:
+        """
+        Transcribes several utterances.
+        Args:
+            audios (list): The utterances.
+        Returns:
+            list: The text of each utterance, in order.
+        """
+        return [self.transcribe(audio) for audio in audios]
+
+    def stream(self, chunks, min_step_s: float = 1.0):
+        """
+        Transcribes audio while it is still arriving.
+        Args:
+            chunks (iterable): Successive pieces of one utterance.
+            min_step_s (float, optional): Minimum amount of new audio before re-decoding.
+        Yields:
+            str: The text that is final so far, then the full transcript once the chunks end.
+        """
+        from incremental_stt import IncrementalTranscriber
+
+        transcriber = IncrementalTranscriber(self, min_step_s=min_step_s)
+        pieces = []
+        for chunk in chunks:
+            pieces.append(np.asarray(chunk, dtype=np.float32))
+            yield transcriber.update(np.concatenate(pieces))
+        yield transcriber.finalize(np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32))
+
+    def share_memory(self):
+        """Moves the weights into shared memory before pre-forking workers, where the backend supports it."""
+
+    def after_fork(self):
+        """Called in each pre-forked worker; backends whose runtime state does not survive fork reload here."""
+
+
+class WhisperEngine(STTEngine):
+    """openai-whisper in PyTorch, with batched decoding and optional int8/bf16 CPU precision."""
+
+    name = "whisper"
+
+    def __init__(self, model_name: str = "base.en", device: str = None, language: str = "en",
+                 fp16: bool = False, precision: str = "fp32", beam_size: int = None):
+        """
+        Initializes the WhisperEngine class.
+        Args:
+            model_name (str, optional): The Whisper model size.
+            device (str, optional): "cpu" or "cuda". Defaults to CUDA when available.
+            language (str, optional): The spoken language.
+            fp16 (bool, optional): Whether to decode in half precision (GPU only).
+            precision (str, optional): CPU inference precision: "fp32", "int8" or "bf16".
+            beam_size (int, optional): Beam size; None decodes greedily.
+        """
+        super().__init__(model_name, device, language)
+        self.fp16 = fp16
+        self.precision = precision
+        self.beam_size = beam_size
+
+    def load(self, phase=None):
+        from model_registry import load_whisper
+
+        phase = phase or (lambda name: nullcontext())
+        self.model = load_whisper(phase, self.model_name, device=self.device, precision=self.precision)
+        self.device = self.model.device.type
+        return self
+
+    def transcribe(self, audio, initial_prompt=None):
+        from stt_batching import transcribe_batch
+
+        # Assistant turns are a few seconds long, so skip the long-form loop
+        return transcribe_batch(self.model, [audio], fp16=self.fp16, language=self.language,
+                                beam_size=self.beam_size, prompt=initial_prompt)[0]
+
+    def transcribe_words(self, audio, initial_prompt=None):
+        result = self.model.transcribe(
+            audio,
+            fp16=self.fp16,
+            language=self.language,
+            beam_size=self.beam_size,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=initial_prompt,
+        )
+        return [
+            (word["end"], word["word"])
+            for segment in result.get("segments", [])
+            for word in segment.get("words", [])
+        ]
+
+    def transcribe_batch(self, audios):
+        from stt_batching import transcribe_batch
+
+        return transcribe_batch(self.model, audios, fp16=self.fp16, language=self.language, beam_size=self.beam_size)
+
+    def share_memory(self):
+        self.model.share_memory()
+
+
+class FasterWhisperEngine(STTEngine):
+    """
+    faster-whisper: the same Whisper models converted to CTranslate2, which runs int8 CPU
+    inference with fused kernels and no PyTorch dependency.
+    """
+
+    name = "faster-whisper"
+
+    def __init__(self, model_name: str = "base.en", device: str = None, language: str = "en",
+                 compute_type: str = "int8", beam_size: int = None, cpu_threads: int = 0):
+        """
+        Initializes the FasterWhisperEngine class.
+        Args:
+            model_name (str, optional): The Whisper model size, or a path to a converted model.
+            device (str, optional): "cpu", "cuda" or "auto". Defaults to "auto".
+            language (str, optional): The spoken language.
+            compute_type (str, optional): CTranslate2 compute type, e.g. "int8", "int8_float16", "float32".
+            beam_size (int, optional): Beam size; None decodes greedily, as the whisper engine does.
+            cpu_threads (int, optional): Intra-op CPU threads (0 = CTranslate2's default).
+        """
+        super().__init__(model_name, device or "auto", language)
+        self.precision = compute_type
+        self.beam_size = beam_size
+        self.cpu_threads = cpu_threads
+
+    def load(self, phase=None):
+        phase = phase or (lambda name: nullcontext())
+        with phase("import"):
+            from faster_whisper import WhisperModel
+        with phase("load"):
+            self.model = WhisperModel(
+                self.model_name,
+                device=self.device,
+                compute_type=self.precision,
+                cpu_threads=self.cpu_threads,
+            )
+        return self
+
+    def _segments(self, audio, initial_prompt=None, word_timestamps=False):
+        segments, _ = self.model.transcribe(
+            np.asarray(audio, dtype=np.float32),
+            language=self.language,
+            beam_size=self.beam_size or 1,
+            initial_prompt=initial_prompt,
+            condition_on_previous_text=False,
+            word_timestamps=word_timestamps,
+        )
+        return list(segments)  # Decoding is lazy until the generator is consumed
+
+    def transcribe(self, audio, initial_prompt=None):
+        return "".join(segment.text for segment in self._segments(audio, initial_prompt)).strip()
+
+    def after_fork(self):
+        # CTranslate2's worker threads do not survive fork, so each worker loads its own
+        # (int8, so small) copy rather than sharing the master's
+        self.load()
+
+    def transcribe_words(self, audio, initial_prompt=None):
+        return [
+            (word.end, word.word)
+            for segment in self._segments(audio, initial_prompt, word_timestamps=True)
+            for word in segment.words or []
+        ]
+
+
+STT_ENGINES = {engine.name: engine for engine in (WhisperEngine, FasterWhisperEngine)}
+
+
+def create_stt_engine(settings: dict = None, device: str = None) -> STTEngine:
+    """
+    Creates the engine selected by the `stt` section of config/config.yaml.
+    Args:
+        settings (dict, optional): The stt settings: engine, model, language, and the
+            engine's own options (fp16, precision and beam_size for whisper; compute_type,
+            beam_size and cpu_threads for faster-whisper).
+        device (str, optional): Overrides the configured device.
+    Returns:
+        STTEngine: The engine, not yet loaded.
+    """
+    settings = dict(settings or {})
+    name = settings.pop("engine", WhisperEngine.name)
+    if name not in STT_ENGINES:
+        raise ValueError(f"Unknown STT engine '{name}', expected one of {', '.join(STT_ENGINES)}")
+
+    options = {"model_name": settings.pop("model", "base.en"), "language": settings.pop("language", "en")}
+    configured_device = settings.pop("device", None)
+    options["device"] = device or (None if configured_device == "auto" else configured_device)
+
+    engine_class = STT_ENGINES[name]
+    accepted = inspect.signature(engine_class).parameters
+    for key, value in settings.items():
+        if key in accepted:
+            options[key] = value
+        else:
+            logger.warning(f"Ignoring stt.{key}: not an option of the {name} engine")
+    return engine_class(**options)
@@ -0,0 +1,154 @@
+"""
+Pitch-preserving time stretching (WSOLA) for speech speed control
+"""
+
+import numpy as np
+
+
+class TimeStretcher:
+    """
+    Changes the speed of audio without changing its pitch, using waveform-similarity
+    overlap-add (WSOLA). Audio can be fed in chunks, so it works on streamed synthesis.
+    """
+
+    def __init__(self, speed: float, sample_rate: int, frame_ms: float = 20.0, tolerance_ms: float = 10.0):
+        """
+        Initializes the TimeStretcher class.
+        Args:
+            speed (float): Speed multiplier (1.0 = normal, 1.2 = 20% faster, etc.)
+            sample_rate (int): The sample rate of the audio.
+            frame_ms (float, optional): Analysis frame length in milliseconds.
+            tolerance_ms (float, optional): How far each frame may shift to line up with the previous one.
+        """
+        if speed <= 0:
+            raise ValueError(f"speed must be positive, got {speed}")
+
+        self.speed = speed
+        self.frame = max(16, int(sample_rate * frame_ms / 1000) // 2 * 2)
+        self.hop = self.frame // 2
+        self.analysis_hop = self.hop * speed
+        self.tolerance = max(1, int(sample_rate * tolerance_ms / 1000))
+        # Periodic Hann windows at 50% overlap sum to exactly one
+        self.window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(self.frame) / self.frame)).astype(np.float32)
+        self.coarse_step = 4
+
+        self.input = np.zeros(0, dtype=np.float32)
+        self.input_offset = 0  # Absolute index of self.input[0]
+        self.frames = 0
+        self.continuation = 0  # Absolute input index that would seamlessly follow the last frame
+        self.overlap = np.zeros(self.hop, dtype=np.float32)
+        self.pending = np.zeros(0, dtype=np.float32)  # Output held back until the input is long enough to need it
+        self.consumed = 0
+        self.produced = 0
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        Feeds the next chunk of audio.
+        Args:
+            chunk (numpy.ndarray): The next input samples (mono).
+        Returns:
+            numpy.ndarray: The output samples that are now final.
+        """
+        chunk = np.asarray(chunk, dtype=np.float32).ravel()
+        self.consumed += len(chunk)
+        self.input = np.concatenate([self.input, chunk])
+
+        # Never emit more than the input so far will stretch to: a short clip at a high speed can
+        # need less than one hop, and emitted samples cannot be taken back at flush
+        out = np.concatenate([self.pending, self._run(final=False)])
+        ready = max(0, int(round(self.consumed / self.speed)) - self.produced)
+        out, self.pending = out[:ready], out[ready:]
+        self.produced += len(out)
+        return out
+
+    def flush(self) -> np.ndarray:
+        """
+        Ends the stream.
+        Returns:
+            numpy.ndarray: The remaining output samples, trimmed or padded so the total length is
+            the input length divided by the speed.
+        """
+        self.input = np.concatenate([self.input, np.zeros(self.frame + self.hop + 2 * self.tolerance, dtype=np.float32)])
+        out = np.concatenate([self.pending, self._run(final=True), self.overlap])
+        self.pending = np.zeros(0, dtype=np.float32)
+
+        remaining = max(0, int(round(self.consumed / self.speed)) - self.produced)
+        out = np.pad(out[:remaining], (0, max(0, remaining - len(out))))
+        self.produced += len(out)
+        return out
+
+    def _run(self, final: bool) -> np.ndarray:
+        frame, hop, tolerance, step = self.frame, self.hop, self.tolerance, self.coarse_step
+        offset = self.input_offset
+        end = offset + len(self.input)
+        limit = self.consumed + hop  # Stop once frames only cover padding
+        signal = self.input
+
+        # The alignment search is inherently sequential (each frame matches the continuation
+        # of the previous one), so only frame positions are found here; windowing and
+        # overlap-add then run once for all of them
+        positions = []
+        frames, continuation = self.frames, self.continuation
+        while True:
+            nominal = int(round(frames * self.analysis_hop))
+            if final and nominal >= limit:
+                break
+            if frames == 0:
+                if end < frame:
+                    break
+                position = 0
+            else:
+                low = max(0, nominal - tolerance)
+                high = nominal + tolerance
+                if high + frame > end or continuation + frame > end:
+                    break
+                template = signal[continuation - offset:continuation - offset + frame]
+                region = signal[low - offset:high - offset + frame]
+
+                # Coarse search on every few samples, then refine around the best match
+                best = int(np.correlate(region[::step], template[::step], mode="valid").argmax()) * step
+                lo = max(0, best - step + 1)
+                hi = min(high - low + 1, best + step)
+                fine = np.correlate(region[lo:hi + frame - 1], template, mode="valid")
+                position = low + lo + int(fine.argmax())
+
+            positions.append(position)
+            continuation = position + hop
+            frames += 1
+        self.frames, self.continuation = frames, continuation
+
+        if positions:
+            starts = np.asarray(positions) - offset
+            windowed = signal[starts[:, None] + np.arange(frame)] * self.window
+            out = windowed[:, :hop].copy()
+            out[0] += self.overlap
+            out[1:] += windowed[:-1, hop:]
+            self.overlap = windowed[-1, hop:]
+            out = out.ravel()
+        else:
+            out = np.zeros(0, dtype=np.float32)
+
+        # Drop input that no future frame can reach
+        keep_from = min(self.continuation, int(self.frames * self.analysis_hop) - tolerance)
+        drop = max(0, keep_from - self.input_offset)
+        if drop:
+            self.input = self.input[drop:]
+            self.input_offset += drop
+
+        return out
+
+
+def time_stretch(audio_array: np.ndarray, speed: float, sample_rate: int) -> np.ndarray:
+    """
+    Changes the speed of a clip while preserving its pitch.
+    Args:
+        audio_array (numpy.ndarray): The audio data (mono).
+        speed (float): Speed multiplier (1.0 = normal, 1.2 = 20% faster, etc.)
+        sample_rate (int): The sample rate of the audio.
+    Returns:
+        numpy.ndarray: The time-stretched audio, about len(audio_array) / speed samples long.
+    """
+    if speed == 1.0 or len(audio_array) == 0:
+        return audio_array
+    stretcher = TimeStretcher(speed, sample_rate)
+    return np.concatenate([stretcher.process(audio_array), stretcher.flush()])
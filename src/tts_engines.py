@@ -0,0 +1,187 @@
+"""
+Text-to-speech engines: Bark for quality, a lightweight engine for latency, and the policy choosing between them
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+
+import numpy as np
+
+from streaming import SentenceSplitter
+
+logger = logging.getLogger(__name__)
+
+
+class TTSEngine(ABC):
+    """
+    A text-to-speech backend. Subclasses must implement synthesize (an engine without it
+    cannot be created); batching and long-form synthesis fall back to it unless the
+    backend can do better.
+    """
+
+    name = None
+
+    @abstractmethod
+    def synthesize(self, text: str, voice_preset: str = None, speed: float = None):
+        """
+        Synthesizes one sentence.
+        Args:
+            text (str): The input text.
+            voice_preset (str, optional): The voice, if the engine has several.
+            speed (float, optional): Speed multiplier (1.0 = normal).
+        Returns:
+            tuple: The sample rate and the audio array.
+        """
+
+    def batch_synthesize(self, texts: list, voice_preset: str = None, speed: float = None):
+        """
+        Synthesizes several sentences.
+        Args:
+            texts (list): The input texts; they share the voice and speed.
+            voice_preset (str, optional): The voice, if the engine has several.
+            speed (float, optional): Speed multiplier (1.0 = normal).
+        Returns:
+            tuple: The sample rate and a list with one audio array per text.
+        """
+        results = [self.synthesize(text, voice_preset, speed) for text in texts]
+        return results[0][0] if results else None, [audio_array for _, audio_array in results]
+
+    def long_form_synthesize(self, text: str, voice_preset: str = None, speed: float = None):
+        """
+        Synthesizes a multi-sentence text with a short pause after each sentence.
+        Args:
+            text (str): The input text.
+            voice_preset (str, optional): The voice, if the engine has several.
+            speed (float, optional): Speed multiplier (1.0 = normal).
+        Returns:
+            tuple: The sample rate and the audio array.
+        """
+        splitter = SentenceSplitter()
+        sentences = splitter.feed(text) + splitter.flush()
+        sample_rate, audio_arrays = self.batch_synthesize(sentences, voice_preset, speed)
+        silence = np.zeros(int(0.25 * sample_rate), dtype=np.float32)
+        return sample_rate, np.concatenate([piece for audio_array in audio_arrays for piece in (audio_array, silence)])
+
+    def warm_up(self, voice_preset: str = None):
+        """Runs one short synthesis so the first real request does not pay for setup."""
+        self.synthesize("Hello.", voice_preset)
+
+    def after_fork(self):
+        """Called in each pre-forked worker; backends whose runtime state does not survive fork reload here."""
+
+
+class PiperEngine(TTSEngine):
+    """
+    Piper: a small VITS voice exported to ONNX. It speaks a sentence in tens of milliseconds
+    on one CPU core, against seconds for Bark, at the cost of a plainer single voice.
+    """
+
+    name = "piper"
+
+    def __init__(self, model: str, speaker_id: int = None, use_cuda: bool = False):
+        """
+        Initializes the PiperEngine class without loading the voice.
+        Args:
+            model (str): Path to the voice's .onnx file (its .onnx.json config sits next to it).
+            speaker_id (int, optional): The speaker, for multi-speaker voices.
+            use_cuda (bool, optional): Whether to run onnxruntime on the GPU.
+        """
+        self.model = model
+        self.speaker_id = speaker_id
+        self.use_cuda = use_cuda
+        self.voice = None
+
+    def load(self, phase=None):
+        """
+        Loads the voice.
+        Args:
+            phase (callable, optional): Startup timer from ModelRegistry; phase(name) wraps each loading step.
+        Returns:
+            PiperEngine: The engine itself, so it can be registered as a ModelRegistry loader.
+        """
+        phase = phase or (lambda name: nullcontext())
+        with phase("import"):
+            from piper import PiperVoice
+        with phase("load"):
+            self.voice = PiperVoice.load(self.model, use_cuda=self.use_cuda)
+        return self
+
+    def synthesize(self, text, voice_preset=None, speed=None):
+        # Piper has one voice per model, so Bark voice presets are ignored; speed is native
+        audio = b"".join(self.voice.synthesize_stream_raw(
+            text,
+            speaker_id=self.speaker_id,
+            length_scale=1.0 / (speed or 1.0),
+        ))
+        return self.voice.config.sample_rate, np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+
+    def after_fork(self):
+        # onnxruntime's thread pool does not survive fork; the voice is small enough to reload
+        self.load()
+
+
+FAST_TTS_ENGINES = {engine.name: engine for engine in (PiperEngine,)}
+
+
+def create_fast_tts_engine(settings: dict = None):
+    """
+    Creates the lightweight engine configured in the `tts.fast` section of config/config.yaml.
+    Args:
+        settings (dict, optional): The engine name and its options, e.g. {"engine": "piper", "model": "..."}.
+    Returns:
+        TTSEngine: The engine, not yet loaded, or None if no fast engine is configured.
+    """
+    settings = dict(settings or {})
+    name = settings.pop("engine", None)
+    if not name:
+        return None
+    if name not in FAST_TTS_ENGINES:
+        raise ValueError(f"Unknown fast TTS engine '{name}', expected one of {', '.join(FAST_TTS_ENGINES)}")
+    return FAST_TTS_ENGINES[name](**settings)
+
+
+class TTSRoutingPolicy:
+    """
+    Decides which engine speaks a piece of text. Bark is kept for real replies and voice
+    previews; short utterances, system prompts, and anything that would wait longer than the
+    latency budget for Bark go to the fast engine, which bounds worst-case latency.
+
+    A conversation reply is routed once, as a whole, with kind "reply": its sentences must
+    share one voice, so the word-count rule does not apply to them.
+    """
+
+    def __init__(self, max_fast_words: int = 3, fast_kinds=("system",), quality_kinds=("preview",),
+                 latency_budget: float = None):
+        """
+        Initializes the TTSRoutingPolicy class.
+        Args:
+            max_fast_words (int, optional): Standalone texts with at most this many words use the fast engine.
+            fast_kinds (iterable, optional): Request kinds that always use the fast engine.
+            quality_kinds (iterable, optional): Request kinds that always use Bark (e.g. previewing a Bark voice).
+            latency_budget (float, optional): Seconds a request may expect to wait for Bark before
+                falling back to the fast engine. None disables the check.
+        """
+        self.max_fast_words = max_fast_words
+        self.fast_kinds = set(fast_kinds)
+        self.quality_kinds = set(quality_kinds)
+        self.latency_budget = latency_budget
+
+    def use_fast(self, text: str, kind: str = "speech", expected_seconds: float = 0.0) -> bool:
+        """
+        Whether the fast engine should speak this text.
+        Args:
+            text (str): The text to speak; for a reply, its first sentence.
+            kind (str, optional): The request kind: "speech" (standalone text), "reply",
+                "preview", "system", ...
+            expected_seconds (float, optional): How long Bark is expected to take, queueing included.
+        Returns:
+            bool: True for the fast engine, False for Bark.
+        """
+        if kind in self.quality_kinds:
+            return False
+        if kind in self.fast_kinds:
+            return True
+        if kind != "reply" and len(text.split()) <= self.max_fast_words:
+            return True
+        return self.latency_budget is not None and expected_seconds > self.latency_budget
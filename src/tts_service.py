@@ -3,8 +3,13 @@ import torch
 import warnings
 import numpy as np
 from transformers import AutoProcessor, BarkModel
-from scipy.signal import resample
+from time_stretch import time_stretch
+from quantization import apply_precision
+from tts_engines import TTSEngine
 import json
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
 
 warnings.filterwarnings(
     "ignore",
@@ -12,22 +17,96 @@ warnings.filterwarnings(
 )
 
 
-class TextToSpeechService:
-    def __init__(self, device: str = "cuda" if torch.cuda.is_available() else "cpu"):
+class VoicePromptCache:
+    """
+    Bounded LRU cache of Bark speaker history prompts, already moved to the model's device.
+    """
+
+    def __init__(self, processor, device: str, max_size: int = 32):
+        """
+        Initializes the VoicePromptCache class.
+        Args:
+            processor (BarkProcessor): The processor used to resolve and load voice presets.
+            device (str): The device the prompt tensors are moved to.
+            max_size (int, optional): Maximum number of presets kept; the least recently used is evicted.
+        """
+        self.processor = processor
+        self.device = device
+        self.max_size = max_size
+        self.prompts = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, voice_preset: str):
+        """
+        Returns the history prompt for a voice preset, loading it on first use.
+        Args:
+            voice_preset (str): The voice preset, e.g. "v2/en_speaker_6".
+        Returns:
+            dict: The semantic, coarse and fine prompt tensors on the model's device.
+        """
+        with self.lock:
+            if voice_preset in self.prompts:
+                self.prompts.move_to_end(voice_preset)
+                return self.prompts[voice_preset]
+
+        # Load outside the lock so a slow first load does not block cached voices
+        prompt = self.processor("", voice_preset=voice_preset, return_tensors="pt")["history_prompt"]
+        prompt = {k: v.to(self.device) for k, v in prompt.items()}
+
+        with self.lock:
+            self.prompts[voice_preset] = prompt
+            self.prompts.move_to_end(voice_preset)
+            while len(self.prompts) > self.max_size:
+                self.prompts.popitem(last=False)
+        return prompt
+
+    def preload(self, voice_presets):
+        """Loads the history prompts for the given voice presets ahead of time."""
+        for voice_preset in voice_presets:
+            self.get(voice_preset)
+
+
+class TextToSpeechService(TTSEngine):
+    """Bark (suno/bark-small): expressive multi-voice speech, batched and cached, but slow on CPU."""
+
+    name = "bark"
+
+    def __init__(self, device: str = "cuda" if torch.cuda.is_available() else "cpu", audio_cache=None, phase=None,
+                 precision: str = "fp32", model_name: str = "suno/bark-small", max_semantic_tokens: int = None):
         """
         Initializes the TextToSpeechService class.
         Args:
             device (str, optional): The device to be used for the model, either "cuda" if a GPU is available or "cpu".
             Defaults to "cuda" if available, otherwise "cpu".
+            audio_cache (AudioCache, optional): Cache of previously synthesized audio. Disabled if None.
+            phase (callable, optional): Startup timer from ModelRegistry; phase(name) wraps each loading step.
+            precision (str, optional): CPU inference precision: "fp32", "int8" or "bf16".
+            model_name (str, optional): "suno/bark-small", or "suno/bark" for the full-size model.
+            max_semantic_tokens (int, optional): Cap on the semantic tokens generated per text, which bounds
+                the slowest of Bark's three stages. Defaults to Bark's own limit.
         """
+        phase = phase or (lambda name: nullcontext())
         self.device = device
-        self.processor = AutoProcessor.from_pretrained("suno/bark-small")
-        self.model = BarkModel.from_pretrained("suno/bark-small")
-        self.model.to(self.device)
+        self.model_name = model_name
+        with phase("load"):
+            self.processor = AutoProcessor.from_pretrained(self.model_name)
+            self.model = BarkModel.from_pretrained(self.model_name)
+        with phase("to_device"):
+            self.model.to(self.device)
+        with phase("precision"):
+            # The three GPT-style sub-models do the token generation; the codec decoder stays fp32
+            apply_precision(self.model, precision, autocast_modules=[
+                self.model.semantic, self.model.coarse_acoustics, self.model.fine_acoustics,
+            ])
+        self.precision = precision
+        self.set_max_semantic_tokens(max_semantic_tokens)
+        self.voice_prompts = VoicePromptCache(self.processor, self.device)
+        self.audio_cache = audio_cache
         
         # Default settings
         self.default_voice = "v2/en_speaker_6"  # Warm female, friendly
         self.default_speed = 1.2  # 1.2x faster than normal
+        self.max_batch_size = 8  # Sentences per batched generate call
         
         # Available voices (based on actual voice characteristics)
         self.available_voices = {
@@ -86,23 +165,115 @@ class TextToSpeechService:
             voice_preset = self.default_voice
         if speed is None:
             speed = self.default_speed
+
+        cached = self.get_cached(text, voice_preset, speed)
+        if cached is not None:
+            return cached
             
-        inputs = self.processor(text, voice_preset=voice_preset, return_tensors="pt")
+        sample_rate, audio_array = self._generate(text, voice_preset)
+        
+        # Apply speed adjustment without shifting the pitch
+        if speed != 1.0:
+            audio_array = time_stretch(audio_array, speed, sample_rate)
+
+        if self.audio_cache is not None:
+            self.audio_cache.put(self._cache_key(text, voice_preset, speed), sample_rate, audio_array)
+        
+        return sample_rate, audio_array
+
+    def warm_up(self, voice_preset: str = None):
+        """
+        Runs one short generation, bypassing the cache, so the first real request does not pay
+        for device setup and kernel selection.
+        Args:
+            voice_preset (str, optional): The voice to warm up with. Defaults to the default voice.
+        """
+        self._generate("Hello.", voice_preset or self.default_voice)
+
+    def _generate(self, text, voice_preset):
+        inputs = self.processor(text, return_tensors="pt")
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        inputs["history_prompt"] = self.voice_prompts.get(voice_preset)
 
         with torch.no_grad():
-            audio_array = self.model.generate(**inputs, pad_token_id=10000)
+            audio_array = self.model.generate(**inputs, pad_token_id=10000, **self.generation_options)
+
+        return self.model.generation_config.sample_rate, audio_array.cpu().numpy().squeeze()
+
+    def get_cached(self, text: str, voice_preset: str = None, speed: float = None):
+        """
+        Returns previously synthesized audio for this text, voice and speed without running the model.
+        Args:
+            text (str): The input text.
+            voice_preset (str, optional): The voice preset.
+            speed (float, optional): Speed multiplier.
+        Returns:
+            tuple: The sample rate and audio array, or None if not cached (or caching is disabled).
+        """
+        if self.audio_cache is None:
+            return None
+        if voice_preset is None:
+            voice_preset = self.default_voice
+        if speed is None:
+            speed = self.default_speed
+        return self.audio_cache.get(self._cache_key(text, voice_preset, speed))
+
+    def _cache_key(self, text, voice_preset, speed):
+        # Reduced precision changes the audio, so it gets its own cache entries
+        model_id = self.model_name if self.precision == "fp32" else f"{self.model_name}@{self.precision}"
+        return self.audio_cache.make_key(text, voice_preset, speed, model_id)
+
+    def batch_synthesize(self, texts: list, voice_preset: str = None, speed: float = None, check_cache: bool = True):
+        """
+        Synthesizes several texts with one padded generate call and splits the outputs back.
+        Args:
+            texts (list): The input texts to be synthesized; they share the voice preset and speed.
+            voice_preset (str, optional): The voice preset to be used for the synthesis.
+            speed (float, optional): Speed multiplier (1.0 = normal, 1.2 = 20% faster, etc.)
+            check_cache (bool, optional): Whether to look the texts up in the audio cache first. Callers
+                that already did (and missed) pass False, so each miss is counted once.
+        Returns:
+            tuple: The sample rate and a list with one audio array per input text, trimmed to its real length.
+        """
+        if voice_preset is None:
+            voice_preset = self.default_voice
+        if speed is None:
+            speed = self.default_speed
 
-        audio_array = audio_array.cpu().numpy().squeeze()
+        texts = list(texts)
         sample_rate = self.model.generation_config.sample_rate
-        
-        # Apply speed adjustment
-        if speed != 1.0:
-            # Calculate new length for speed adjustment
-            new_length = int(len(audio_array) / speed)
-            audio_array = resample(audio_array, new_length)
-        
-        return sample_rate, audio_array
+        audio_arrays = [None] * len(texts)
+
+        # Serve cached texts directly and only generate the rest
+        for i, text in enumerate(texts if check_cache else []):
+            cached = self.get_cached(text, voice_preset, speed)
+            if cached is not None:
+                audio_arrays[i] = cached[1]
+        missing = [i for i, audio_array in enumerate(audio_arrays) if audio_array is None]
+        if not missing:
+            return sample_rate, audio_arrays
+
+        inputs = self.processor([texts[i] for i in missing], return_tensors="pt")
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        inputs["history_prompt"] = self.voice_prompts.get(voice_preset)
+
+        with torch.no_grad():
+            audio_batch, output_lengths = self.model.generate(
+                **inputs, pad_token_id=10000, return_output_lengths=True, **self.generation_options
+            )
+
+        audio_batch = audio_batch.cpu().numpy()
+        output_lengths = output_lengths.cpu().numpy()
+
+        for i, audio_array, length in zip(missing, audio_batch, output_lengths):
+            audio_array = audio_array[:length]
+            if speed != 1.0:
+                audio_array = time_stretch(audio_array, speed, sample_rate)
+            audio_arrays[i] = audio_array
+            if self.audio_cache is not None:
+                self.audio_cache.put(self._cache_key(texts[i], voice_preset, speed), sample_rate, audio_array)
+
+        return sample_rate, audio_arrays
 
     def long_form_synthesize(self, text: str, voice_preset: str = None, speed: float = None):
         """
@@ -114,21 +285,54 @@ class TextToSpeechService:
         Returns:
             tuple: A tuple containing the sample rate and the generated audio array.
         """
+        sentences = nltk.sent_tokenize(text)
+        sample_rate = self.model.generation_config.sample_rate
+        silence = np.zeros(int(0.25 * sample_rate))
+
+        # The whole reply is needed before returning, so batch sentences for throughput
+        pieces = []
+        for i in range(0, len(sentences), self.max_batch_size):
+            _, audio_arrays = self.batch_synthesize(
+                sentences[i:i + self.max_batch_size], voice_preset, speed
+            )
+            for audio_array in audio_arrays:
+                pieces += [audio_array, silence.copy()]
+
+        return sample_rate, np.concatenate(pieces)
+
+    def stream_synthesize(self, text: str, voice_preset: str = None, speed: float = None):
+        """
+        Synthesizes long-form text sentence by sentence, yielding each sentence's audio as soon as it is ready.
+        Args:
+            text (str): The input text to be synthesized.
+            voice_preset (str, optional): The voice preset to be used for the synthesis.
+            speed (float, optional): Speed multiplier (1.0 = normal, 1.2 = 20% faster, etc.)
+        Yields:
+            tuple: The sample rate and the audio array of one sentence, followed by a short pause.
+        """
         if voice_preset is None:
             voice_preset = self.default_voice
         if speed is None:
             speed = self.default_speed
-            
-        pieces = []
-        sentences = nltk.sent_tokenize(text)
+
         silence = np.zeros(int(0.25 * self.model.generation_config.sample_rate))
 
-        for sent in sentences:
+        for sent in nltk.sent_tokenize(text):
             sample_rate, audio_array = self.synthesize(sent, voice_preset, speed)
-            pieces += [audio_array, silence.copy()]
-
-        return self.model.generation_config.sample_rate, np.concatenate(pieces)
+            yield sample_rate, np.concatenate([audio_array, silence])
     
+    def preload_voices(self, voice_presets=None):
+        """
+        Loads speaker prompts ahead of time so no request pays for reading them from disk.
+        Args:
+            voice_presets (list, optional): The presets to load. Defaults to every preset in available_voices.
+        """
+        if voice_presets is None:
+            voice_presets = {self.default_voice}
+            for voices in self.available_voices.values():
+                voice_presets.update(voices)
+        self.voice_prompts.preload(sorted(voice_presets))
+
     def get_available_voices(self):
         """Returns the available voice presets."""
         return self.available_voices
@@ -140,11 +344,16 @@ class TextToSpeechService:
     def set_default_speed(self, speed: float):
         """Sets the default speech speed."""
         self.default_speed = speed
+
+    def set_max_semantic_tokens(self, max_semantic_tokens: int = None):
+        """Caps the semantic tokens generated per text (None restores Bark's own limit)."""
+        self.generation_options = {"semantic_max_new_tokens": max_semantic_tokens} if max_semantic_tokens else {}
     
     def get_settings(self):
         """Returns current TTS settings."""
         return {
             'default_voice': self.default_voice,
             'default_speed': self.default_speed,
+            'precision': self.precision,
             'available_voices': self.available_voices
         }
@@ -0,0 +1,204 @@
+"""
+Voice activity detection and endpointing for streamed microphone audio
+"""
+
+from collections import deque
+
+import numpy as np
+
+
+class EnergyVAD:
+    """
+    Frame-level speech detector based on short-time energy and zero-crossing rate,
+    with a noise floor that adapts to the background level.
+    """
+
+    def __init__(self, margin_db: float = 12.0, min_energy_db: float = -50.0, max_zcr: float = 0.35, noise_adapt: float = 0.05):
+        """
+        Initializes the EnergyVAD class.
+        Args:
+            margin_db (float, optional): How far above the noise floor a frame must be to count as speech.
+            min_energy_db (float, optional): Frames quieter than this are never speech.
+            max_zcr (float, optional): Zero-crossing rate above which a quiet-ish frame is treated as hiss, not voice.
+            noise_adapt (float, optional): How quickly the noise floor follows non-speech frames (0..1).
+        """
+        self.margin_db = margin_db
+        self.min_energy_db = min_energy_db
+        self.max_zcr = max_zcr
+        self.noise_adapt = noise_adapt
+        self.noise_db = None
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Classifies a block of frames.
+        Args:
+            frames (numpy.ndarray): Audio frames, shape (n_frames, frame_length), float samples in [-1, 1].
+        Returns:
+            numpy.ndarray: A boolean array, True for frames that contain speech.
+        """
+        if len(frames) == 0:
+            return np.zeros(0, dtype=bool)
+
+        energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        if self.noise_db is None:
+            # Start from the quietest frames seen so far
+            self.noise_db = float(np.percentile(energy_db, 10))
+
+        threshold = max(self.noise_db + self.margin_db, self.min_energy_db)
+        loud = energy_db > threshold
+        # High ZCR is fine for loud frames (fricatives) but marks quiet frames as noise
+        speech = loud & ((zcr < self.max_zcr) | (energy_db > threshold + self.margin_db))
+
+        # Follow the background level down immediately but up only slowly
+        quiet = energy_db[~speech]
+        if len(quiet):
+            level = float(np.mean(quiet))
+            if level < self.noise_db:
+                self.noise_db = level
+            else:
+                self.noise_db += self.noise_adapt * (level - self.noise_db)
+        return speech
+
+
+class Endpointer:
+    """
+    Splits a continuous audio stream into utterances: detects where speech starts and
+    ends, and returns each utterance with leading and trailing silence trimmed.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30, vad: EnergyVAD = None,
+                 start_ms: int = 90, end_silence_ms: int = 700, padding_ms: int = 150, max_utterance_s: float = 30.0):
+        """
+        Initializes the Endpointer class.
+        Args:
+            sample_rate (int, optional): The sample rate of the stream.
+            frame_ms (int, optional): VAD frame length in milliseconds.
+            vad (EnergyVAD, optional): The frame classifier. A default EnergyVAD if None.
+            start_ms (int, optional): Continuous speech needed before an utterance starts.
+            end_silence_ms (int, optional): Silence that ends an utterance.
+            padding_ms (int, optional): Silence kept before and after the speech.
+            max_utterance_s (float, optional): Utterances are cut at this length.
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.vad = vad or EnergyVAD()
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.padding_frames = padding_ms // frame_ms
+        self.max_frames = int(max_utterance_s * 1000 / frame_ms)
+
+        self.remainder = np.zeros(0, dtype=np.float32)
+        self.history = deque(maxlen=self.start_frames + self.padding_frames)
+        self.in_speech = False
+        self.speech_run = 0
+        self.silence_run = 0
+        self.utterance = []
+
+    def process(self, audio: np.ndarray):
+        """
+        Feeds the next chunk of the stream.
+        Args:
+            audio (numpy.ndarray): Mono float32 samples.
+        Returns:
+            list: Events in order, ("start", None) when speech begins and ("end", utterance) when it
+            ends, where utterance is the trimmed audio as a numpy array.
+        """
+        audio = np.concatenate([self.remainder, np.asarray(audio, dtype=np.float32).ravel()])
+        n_frames = len(audio) // self.frame_length
+        self.remainder = audio[n_frames * self.frame_length:]
+        if n_frames == 0:
+            return []
+
+        frames = audio[:n_frames * self.frame_length].reshape(n_frames, self.frame_length)
+        speech = self.vad.classify(frames)
+
+        events = []
+        for frame, is_speech in zip(frames, speech):
+            if not self.in_speech:
+                self.history.append(frame)
+                self.speech_run = self.speech_run + 1 if is_speech else 0
+                if self.speech_run >= self.start_frames:
+                    self.in_speech = True
+                    self.silence_run = 0
+                    self.utterance = list(self.history)
+                    self.history.clear()
+                    events.append(("start", None))
+            else:
+                self.utterance.append(frame)
+                self.silence_run = 0 if is_speech else self.silence_run + 1
+                if self.silence_run >= self.end_frames or len(self.utterance) >= self.max_frames:
+                    events.append(("end", self._finish()))
+        return events
+
+    def flush(self):
+        """
+        Ends the stream, returning the utterance in progress if there is one.
+        Returns:
+            numpy.ndarray: The trimmed utterance, or None if no speech was in progress.
+        """
+        if not self.in_speech:
+            return None
+        return self._finish()
+
+    def reset(self):
+        """Drops any buffered audio and utterance in progress."""
+        self.remainder = np.zeros(0, dtype=np.float32)
+        self.history.clear()
+        self.in_speech = False
+        self.speech_run = 0
+        self.silence_run = 0
+        self.utterance = []
+
+    def _finish(self):
+        keep = len(self.utterance) - max(0, self.silence_run - self.padding_frames)
+        utterance = np.concatenate(self.utterance[:keep])
+        self.in_speech = False
+        self.speech_run = 0
+        self.silence_run = 0
+        self.utterance = []
+        return utterance
+
+
+def trim_silence(audio: np.ndarray, sample_rate: int = 16000, frame_ms: int = 30, padding_ms: int = 150) -> np.ndarray:
+    """
+    Trims leading and trailing non-speech from a complete clip.
+    Args:
+        audio (numpy.ndarray): Mono float32 samples.
+        sample_rate (int, optional): The sample rate of the clip.
+        frame_ms (int, optional): VAD frame length in milliseconds.
+        padding_ms (int, optional): Silence kept on either side of the speech.
+    Returns:
+        numpy.ndarray: The trimmed clip, or the original clip if no speech was detected.
+    """
+    span = speech_span(audio, sample_rate, frame_ms, padding_ms)
+    return audio if span is None else audio[span[0]:span[1]]
+
+
+def speech_span(audio: np.ndarray, sample_rate: int = 16000, frame_ms: int = 30, padding_ms: int = 150):
+    """
+    Finds where the speech in a complete clip starts and ends.
+    Args:
+        audio (numpy.ndarray): Mono float32 samples.
+        sample_rate (int, optional): The sample rate of the clip.
+        frame_ms (int, optional): VAD frame length in milliseconds.
+        padding_ms (int, optional): Silence kept on either side of the speech.
+    Returns:
+        tuple: The start and end sample of the speech plus padding, or None if no speech was detected.
+    """
+    frame_length = int(sample_rate * frame_ms / 1000)
+    n_frames = len(audio) // frame_length
+    if n_frames == 0:
+        return None
+
+    frames = np.asarray(audio[:n_frames * frame_length], dtype=np.float32).reshape(n_frames, frame_length)
+    speech = np.flatnonzero(EnergyVAD().classify(frames))
+    if len(speech) == 0:
+        return None
+
+    padding = int(sample_rate * padding_ms / 1000)
+    start = max(0, speech[0] * frame_length - padding)
+    end = min(len(audio), (speech[-1] + 1) * frame_length + padding)
+    return start, end
@@ -6,7 +6,6 @@ Complete Voice Assistant with Ollama LLM, Whisper STT, and Bark TTS
 import time
 import threading
 import numpy as np
-import whisper
 import sounddevice as sd
 from queue import Queue
 from rich.console import Console
@@ -15,15 +14,16 @@ from langchain.chains import ConversationChain
 from langchain.prompts import PromptTemplate
 from langchain_community.llms import Ollama
 
-# Import our TextToSpeechService
-import sys
-sys.path.append('/home/don')
-from TextToSpeechService import TextToSpeechService
+from model_registry import ModelRegistry, load_tts
+from stt_engines import create_stt_engine
+from config import load_config, get_setting
 
-# Initialize components
+# Initialize components; Whisper and Bark load concurrently in the background
 console = Console()
-stt = whisper.load_model("base.en")
-tts = TextToSpeechService()
+models = ModelRegistry()
+models.register("stt", create_stt_engine(get_setting(load_config(), "stt")).load)
+models.register("tts", load_tts)
+models.start()
 
 # Set up the conversation chain with Ollama
 template = """
@@ -75,9 +75,7 @@ def transcribe(audio_np: np.ndarray) -> str:
     Returns:
         str: The transcribed text.
     """
-    result = stt.transcribe(audio_np, fp16=False)  # Set fp16=True if using a GPU
-    text = result["text"].strip()
-    return text
+    return models.get("stt").transcribe(audio_np)
 
 def get_llm_response(text: str) -> str:
     """
@@ -142,7 +140,7 @@ def main():
 
                 with console.status("🧠 Generating response...", spinner="earth"):
                     response = get_llm_response(text)
-                    sample_rate, audio_array = tts.long_form_synthesize(response)
+                    sample_rate, audio_array = models.get("tts").long_form_synthesize(response)
 
                 console.print(f"[cyan]🤖 Assistant: {response}")
                 play_audio(sample_rate, audio_array)
@@ -0,0 +1,113 @@
+"""
+Warm-up of the speech and language models, with per-component readiness tracking
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+COLD = "cold"
+WARMING = "warming"
+WARM = "warm"
+FAILED = "failed"
+
+
+class WarmupTracker:
+    """
+    Runs dummy inferences so one-time costs (loading weights onto the device, kernel
+    selection, allocator growth, Ollama loading the model) are paid before real traffic,
+    and records each component's state and warm-up time for status reporting.
+    """
+
+    def __init__(self):
+        """Initializes the WarmupTracker class."""
+        self.components = {}
+        self.lock = threading.Lock()
+
+    def warm_up(self, name: str, fn, detail: str = None) -> bool:
+        """
+        Runs one component's warm-up, recording its state and duration.
+        Args:
+            name (str): The component name, e.g. "stt".
+            fn (callable): Performs a dummy inference.
+            detail (str, optional): Extra information to report, e.g. the model name.
+        Returns:
+            bool: True if the warm-up succeeded.
+        """
+        self._set(name, state=WARMING, detail=detail)
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            logger.error(f"Warm-up of {name} failed: {e}")
+            self._set(name, state=FAILED, error=str(e), warmup_seconds=round(time.perf_counter() - start, 3))
+            return False
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Warmed up {name} in {elapsed:.2f}s")
+        self._set(name, state=WARM, warmup_seconds=round(elapsed, 3))
+        return True
+
+    def warm_up_all(self, tasks: dict) -> bool:
+        """
+        Warms several components in parallel and waits for all of them.
+        Args:
+            tasks (dict): Component name to warm-up callable, or to a (callable, detail) pair.
+        Returns:
+            bool: True if every warm-up succeeded.
+        """
+        for name, task in tasks.items():
+            self._set(name, state=COLD, detail=task[1] if isinstance(task, tuple) else None)
+
+        with ThreadPoolExecutor(max_workers=max(1, len(tasks)), thread_name_prefix="warmup") as pool:
+            futures = [
+                pool.submit(self.warm_up, name, *(task if isinstance(task, tuple) else (task,)))
+                for name, task in tasks.items()
+            ]
+            return all(future.result() for future in futures)
+
+    def warm_up_in_background(self, name: str, fn, detail: str = None, on_success=None) -> threading.Thread:
+        """
+        Warms a component on a background thread, then calls on_success (e.g. to swap it in).
+        Args:
+            name (str): The component name.
+            fn (callable): Performs a dummy inference.
+            detail (str, optional): Extra information to report.
+            on_success (callable, optional): Called after a successful warm-up.
+        Returns:
+            threading.Thread: The started thread.
+        """
+        def run():
+            if self.warm_up(name, fn, detail) and on_success:
+                on_success()
+
+        thread = threading.Thread(target=run, daemon=True, name=f"warmup-{name}")
+        thread.start()
+        return thread
+
+    def promote(self, source: str, target: str):
+        """Moves a component's status to another name, e.g. once a replacement model takes over."""
+        with self.lock:
+            if source in self.components:
+                self.components[target] = self.components.pop(source)
+
+    def is_ready(self, names=None) -> bool:
+        """Whether every component (or the given ones) is warm."""
+        with self.lock:
+            names = self.components if names is None else names
+            return bool(names) and all(self.components.get(name, {}).get("state") == WARM for name in names)
+
+    def get_status(self) -> dict:
+        """Returns a copy of every component's state, detail and warm-up time."""
+        with self.lock:
+            return {name: dict(info) for name, info in self.components.items()}
+
+    def _set(self, name, **fields):
+        with self.lock:
+            info = self.components.setdefault(name, {"state": COLD})
+            info.update({key: value for key, value in fields.items() if value is not None})
+            if info["state"] != FAILED:
+                info.pop("error", None)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthesized-audio cache
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from audio_cache import AudioCache
+
+
+def test_key_ignores_whitespace_but_not_voice_or_speed():
+    """Equivalent text shares a key; a different voice or speed does not"""
+    key = AudioCache.make_key("Hello  there!\n", "v2/en_speaker_6", 1.2, "suno/bark-small")
+    assert key == AudioCache.make_key(" Hello there!", "v2/en_speaker_6", 1.2, "suno/bark-small")
+    assert key != AudioCache.make_key("Hello there!", "v2/en_speaker_1", 1.2, "suno/bark-small")
+    assert key != AudioCache.make_key("Hello there!", "v2/en_speaker_6", 1.0, "suno/bark-small")
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    """Entries survive in the disk tier after the memory tier is dropped"""
+    audio = np.sin(np.linspace(0, 100, 24000)).astype(np.float32) * 0.5
+    cache = AudioCache(str(tmp_path))
+    key = cache.make_key("Hi", "v2/en_speaker_6", 1.0, "bark")
+
+    assert cache.get(key) is None
+    cache.put(key, 24000, audio)
+    sample_rate, cached = cache.get(key)
+    assert sample_rate == 24000 and np.array_equal(cached, audio)
+
+    restarted = AudioCache(str(tmp_path))
+    sample_rate, from_disk = restarted.get(key)
+    assert sample_rate == 24000
+    assert np.allclose(from_disk, audio, atol=1e-3)
+
+    stats = restarted.get_stats()
+    assert stats['disk_hits'] == 1 and stats['disk_bytes'] > 0
+
+
+def test_size_based_eviction(tmp_path):
+    """Both tiers stay under their byte limits by evicting the oldest entries"""
+    clip = np.zeros(1000, dtype=np.float32)
+    cache = AudioCache(str(tmp_path), max_memory_bytes=2 * clip.nbytes, max_disk_bytes=5000)
+
+    for i in range(5):
+        cache.put(str(i), 16000, clip)
+
+    stats = cache.get_stats()
+    assert stats['memory_entries'] == 2
+    assert stats['disk_bytes'] <= 5000
+    assert "4" in cache.memory and "0" not in cache.memory
+
+
+def test_concurrent_puts_count_the_file_once(tmp_path, monkeypatch):
+    """A put that loses the race to create the same file does not add to the disk total"""
+    audio = np.zeros(2400, dtype=np.float32)
+    cache = AudioCache(str(tmp_path))
+    key = cache.make_key("Hi", "v2/en_speaker_6", 1.0, "bark")
+    cache.put(key, 24000, audio)
+
+    # Both puts checked for the file before either wrote it
+    monkeypatch.setattr(os.path, "exists", lambda path: False)
+    cache.put(key, 24000, audio)
+    monkeypatch.undo()
+    assert cache.get_stats()['disk_bytes'] == os.path.getsize(tmp_path / f"{key}.wav")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for in-memory audio decoding and encoding
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from audio_io import decode_audio, encode_wav, preprocess_upload
+
+
+def test_wav_round_trip_resamples_to_16k():
+    """A 24 kHz WAV (Bark's rate) decodes to 16 kHz mono for Whisper"""
+    t = np.arange(24000) / 24000
+    audio = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+    wav_bytes = encode_wav(audio, 24000)
+    assert wav_bytes[:4] == b"RIFF"
+
+    decoded = decode_audio(wav_bytes)
+    assert decoded.dtype == np.float32
+    assert len(decoded) == 16000
+    spectrum = np.abs(np.fft.rfft(decoded))
+    assert abs(np.fft.rfftfreq(len(decoded), 1 / 16000)[np.argmax(spectrum)] - 440) < 2
+
+
+def test_uploads_are_trimmed_and_normalized():
+    """Silence around the speech is cut and a quiet recording is brought up to a usable level"""
+    rng = np.random.default_rng(0)
+    t = np.arange(48000) / 48000
+    voiced = 0.2 * sum(np.sin(2 * np.pi * f * t) / (k + 1) for k, f in enumerate([150, 300, 450]))
+    silence = 0.0005 * rng.standard_normal(48000)
+    audio = np.concatenate([silence, voiced, silence]).astype(np.float32)
+
+    prepared = preprocess_upload(encode_wav(audio, 48000))
+    assert 16000 <= len(prepared) < 1.5 * 16000  # One second of speech out of three
+    assert abs(np.max(np.abs(prepared)) - 0.9) < 0.05
+
+
+def test_noise_only_uploads_are_not_amplified():
+    """Without speech there is nothing to normalize, so background noise keeps its level"""
+    noise = (0.005 * np.random.default_rng(0).standard_normal(48000)).astype(np.float32)
+
+    prepared = preprocess_upload(encode_wav(noise, 16000))
+    assert len(prepared) == len(noise)
+    assert np.max(np.abs(prepared)) < 1.1 * np.max(np.abs(noise))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the micro-batcher used to group concurrent inference requests
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from batching import MicroBatcher, Overloaded
+
+
+def test_concurrent_items_are_batched_by_key():
+    """Items with the same key share a batch; results map back to their submitters"""
+    batches = []
+    release = threading.Event()
+
+    def process(items):
+        release.wait(1)
+        batches.append(list(items))
+        return [item[1] * 10 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait=0.2, key=lambda item: item[0])
+    futures = [batcher.submit(("a", 1)), batcher.submit(("b", 2)), batcher.submit(("a", 3))]
+    release.set()
+
+    assert [future.result(timeout=2) for future in futures] == [10, 20, 30]
+    assert sorted(len(batch) for batch in batches) == [1, 2]
+    assert all(len({item[0] for item in batch}) == 1 for batch in batches)
+
+
+def test_batch_errors_propagate_to_every_future():
+    """A failing batch fails all of its futures instead of hanging them"""
+    def process(items):
+        raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher(process, max_batch_size=2, max_wait=0.05)
+    future = batcher.submit("x")
+    try:
+        future.result(timeout=2)
+    except RuntimeError as e:
+        assert "model crashed" in str(e)
+    else:
+        raise AssertionError("expected the batch error")
+
+
+def test_priorities_and_bounded_queue():
+    """Urgent items are served first and a full queue rejects new work with a retry hint"""
+    order = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def process(items):
+        started.set()
+        release.wait(2)
+        order.extend(items)
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=1, max_wait=0, max_queue_size=3)
+    first = batcher.submit("busy")
+    assert started.wait(2)  # The worker is now occupied
+    futures = [batcher.submit("preview", priority=1), batcher.submit("turn", priority=0)]
+
+    try:
+        batcher.submit("another preview", priority=1, max_queued=2)
+    except Overloaded as e:
+        assert e.retry_after >= 1
+    else:
+        raise AssertionError("expected Overloaded")
+
+    release.set()
+    for future in [first, *futures]:
+        future.result(timeout=2)
+    assert order == ["busy", "turn", "preview"]
+    assert batcher.get_stats()['rejected'] == 1
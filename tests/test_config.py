@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the config loader and performance profiles
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config import load_config, get_setting, PROFILE_ENV_VAR
+
+CONFIG = """
+profile: balanced
+profiles:
+  fastest:
+    stt: {model: tiny.en}
+    ollama: {num_predict: 48}
+  balanced:
+    stt: {model: base.en}
+    ollama: {num_predict: 96}
+stt:
+  language: en
+ollama:
+  model: llama3.2:3b
+"""
+
+
+def test_profiles_overlay_the_base_settings(tmp_path, monkeypatch):
+    """The selected profile overrides only the settings it names"""
+    monkeypatch.delenv(PROFILE_ENV_VAR, raising=False)
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG)
+
+    config = load_config(str(path))
+    assert config['profile'] == 'balanced'
+    assert get_setting(config, 'ollama.num_predict') == 96
+    assert get_setting(config, 'stt.model') == 'base.en'
+
+    monkeypatch.setenv(PROFILE_ENV_VAR, 'fastest')
+    config = load_config(str(path))
+    assert get_setting(config, 'stt.model') == 'tiny.en'
+    assert get_setting(config, 'stt.language') == 'en'
+    assert get_setting(config, 'ollama.model') == 'llama3.2:3b'
+    assert get_setting(config, 'ollama.num_predict') == 48
+    assert get_setting(config, 'tts.model', 'suno/bark-small') == 'suno/bark-small'
+
+    with pytest.raises(ValueError):
+        load_config(str(path), profile='missing')
+
+
+def test_shipped_profiles_load():
+    """Every profile in config/config.yaml applies cleanly"""
+    for profile in load_config(profile='balanced')['profiles']:
+        config = load_config(profile=profile)
+        assert config['profile'] == profile
+        assert get_setting(config, 'stt.model')
+        assert get_setting(config, 'ollama.model')
+
+
+def test_explicit_settings_take_precedence_over_the_profile(tmp_path, monkeypatch):
+    """A setting given in the top-level sections survives load_config whichever profile is active"""
+    monkeypatch.delenv(PROFILE_ENV_VAR, raising=False)
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG + "  num_predict: 32\n")
+
+    for profile in ('balanced', 'fastest'):
+        config = load_config(str(path), profile=profile)
+        assert get_setting(config, 'ollama.num_predict') == 32
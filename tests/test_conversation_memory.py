@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-session, token-budgeted conversation memory
+"""
+
+import os
+import sys
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import conversation_memory
+from conversation_memory import BudgetedConversationMemory, SessionStore, SharedSessionStore, estimate_tokens
+
+
+class FakeLLM:
+    """Returns a fixed summary and records each prompt"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return "The user likes tea."
+
+
+def test_history_stays_within_budget():
+    """Old turns are folded into a summary once the recent window exceeds the budget"""
+    llm = FakeLLM()
+    memory = BudgetedConversationMemory(llm=llm, max_tokens=60)
+
+    for turn in range(10):
+        memory.save_turn(f"Question number {turn} about tea", f"Answer number {turn}")
+    deadline = time.monotonic() + 2
+    while not memory.summary and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    messages = memory.messages()
+    contents = [message["content"] for message in messages]
+    assert llm.prompts
+    assert messages[0] == {"role": "system", "content": "Summary of the earlier conversation: The user likes tea."}
+    assert "Question number 0 about tea" not in contents
+    assert messages[-1] == {"role": "assistant", "content": "Answer number 9"}
+    assert memory.token_count() <= 60 + estimate_tokens(contents[0]) + 4
+
+
+def test_folding_keeps_prefix_stable_between_folds():
+    """Turns are folded in blocks, so most turns only append to the message list"""
+    memory = BudgetedConversationMemory(max_tokens=60)
+    appends = 0
+    for turn in range(20):
+        before = memory.messages()
+        memory.save_turn(f"Question number {turn} about tea", f"Answer number {turn}")
+        appends += memory.messages()[:len(before)] == before
+
+    assert appends >= 12
+
+
+def test_session_store_evicts_least_recently_used():
+    """Sessions beyond the limit are evicted oldest first and recreated empty"""
+    store = SessionStore(list, max_sessions=2)
+    store.get("a").append(1)
+    store.get("b")
+    store.get("a")
+    store.get("c")
+
+    assert len(store) == 2
+    assert store.get("a") == [1]
+    assert store.get("b") == []
+
+
+def test_shared_store_sees_updates_from_other_workers():
+    """A turn saved through one store instance is visible through another sharing the mapping"""
+    shared = {}
+    first = SharedSessionStore(BudgetedConversationMemory, shared)
+    second = SharedSessionStore(BudgetedConversationMemory, shared)
+
+    first.get("abc").save_turn("My name is Sam", "Nice to meet you, Sam")
+    messages = second.get("abc").messages()
+
+    assert messages == [
+        {"role": "user", "content": "My name is Sam"},
+        {"role": "assistant", "content": "Nice to meet you, Sam"},
+    ]
+    second.reset("abc")
+    assert first.get("abc").messages() == []
+
+
+class SlowLLM(FakeLLM):
+    """Takes a while to summarize, like a real model"""
+
+    def invoke(self, prompt):
+        time.sleep(0.3)
+        return super().invoke(prompt)
+
+
+def test_late_summary_does_not_overwrite_newer_turns():
+    """A fold finishing after another request saved a turn keeps that turn"""
+    store = SharedSessionStore(partial(BudgetedConversationMemory, llm=SlowLLM(), max_tokens=60), {})
+    for turn in range(4):
+        store.get("abc").save_turn(f"Question number {turn} about tea", f"Answer number {turn}")
+    # Saved by a newer copy of the conversation while the first fold is still running
+    store.get("abc").save_turn("My name is Sam", "Nice to meet you, Sam")
+
+    deadline = time.monotonic() + 2
+    while not store.get("abc").summary and time.monotonic() < deadline:
+        time.sleep(0.01)
+    contents = [message["content"] for message in store.get("abc").messages()]
+    assert contents[0] == "Summary of the earlier conversation: The user likes tea."
+    assert contents[-2:] == ["My name is Sam", "Nice to meet you, Sam"]
+
+    conversation_memory._summarizer.submit(lambda: None).result()  # Let the newer copy's fold finish too
+    contents = [message["content"] for message in store.get("abc").messages()]
+    assert contents[-2:] == ["My name is Sam", "Nice to meet you, Sam"]
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental (local-agreement) transcription, using a stub STT engine
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from incremental_stt import IncrementalTranscriber
+
+SAMPLE_RATE = 16000
+WORDS = [" Turn", " on", " the", " kitchen", " lights", " please."]
+
+
+class StubWhisper:
+    """Pretends each word takes half a second and records what it was asked to decode"""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe_words(self, audio, initial_prompt=None):
+        self.calls.append((len(audio), initial_prompt))
+        start = self.window_start
+        words = []
+        for i, word in enumerate(WORDS):
+            end = (i + 1) * 0.5
+            if start < end <= start + len(audio) / SAMPLE_RATE:
+                words.append((end - start, word))
+        return words
+
+
+def test_agreed_words_are_committed_and_window_slides():
+    """Words seen in two consecutive decodes become final and leave the decoding window"""
+    model = StubWhisper()
+    transcriber = IncrementalTranscriber(model, min_step_s=0.5)
+    audio = np.zeros(3 * SAMPLE_RATE, dtype=np.float32)
+
+    for seconds in (1.0, 1.5, 2.0):
+        model.window_start = transcriber.offset / SAMPLE_RATE
+        transcriber.update(audio[:int(seconds * SAMPLE_RATE)])
+
+    assert transcriber.committed_text == "Turn on the"
+    assert transcriber.offset == int(1.5 * SAMPLE_RATE)
+
+    model.window_start = transcriber.offset / SAMPLE_RATE
+    assert transcriber.finalize(audio) == "Turn on the kitchen lights please."
+    # The final decode only covered the uncommitted tail, prompted with the committed text
+    assert model.calls[-1] == (int(1.5 * SAMPLE_RATE), "Turn on the")
+
+
+def test_small_increments_do_not_redecode():
+    """Nothing is decoded until enough new audio has arrived"""
+    model = StubWhisper()
+    model.window_start = 0.0
+    transcriber = IncrementalTranscriber(model, min_step_s=1.0)
+    transcriber.update(np.zeros(SAMPLE_RATE // 2, dtype=np.float32))
+    assert model.calls == []
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent, lazy model loading
+"""
+
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import model_registry
+from model_registry import ModelRegistry, set_torch_threads
+
+
+def test_models_load_concurrently_with_phase_timings():
+    """Registered models load in parallel and each phase is timed"""
+    registry = ModelRegistry()
+    barrier = threading.Barrier(2, timeout=2)
+
+    def loader(value):
+        def load(phase):
+            with phase("load"):
+                barrier.wait()  # Only passes if both loads run at the same time
+            with phase("to_device"):
+                time.sleep(0.01)
+            return value
+        return load
+
+    registry.register("stt", loader("whisper"))
+    registry.register("tts", loader("bark"))
+    registry.start()
+
+    assert registry.get("stt") == "whisper"
+    assert registry.get("tts") == "bark"
+    timings = registry.get_timings()
+    assert set(timings["stt"]) == {"load", "to_device", "total"}
+    assert timings["tts"]["to_device"] >= 0.01
+    assert timings["tts"]["total"] >= timings["tts"]["load"]
+
+
+def test_models_are_loaded_lazily_and_once():
+    """A model that was not started loads on first use, and only once"""
+    registry = ModelRegistry()
+    calls = []
+    registry.register("llm", lambda phase: calls.append(1) or "client")
+
+    assert not registry.is_loaded("llm")
+    assert registry.get("llm") == "client"
+    assert registry.get("llm") == "client"
+    assert registry.is_loaded("llm")
+    assert calls == [1]
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_zero_torch_threads_restores_the_default(monkeypatch):
+    """Switching back to a profile without a thread count undoes the previous profile's count"""
+    torch = pytest.importorskip("torch")
+    default = torch.get_num_threads()
+    monkeypatch.setattr(model_registry, "_default_torch_threads", None)
+    try:
+        set_torch_threads(1)
+        assert torch.get_num_threads() == 1
+        set_torch_threads(0)
+        assert torch.get_num_threads() == default
+    finally:
+        torch.set_num_threads(default)
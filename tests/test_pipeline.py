@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for the pipeline stages
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from batching import Overloaded
+from pipeline import Stage
+
+
+def test_stage_runs_jobs_concurrently_and_reports_stats():
+    """A stage serves as many jobs at once as it has workers and tracks their outcome"""
+    stage = Stage('llm', workers=2)
+    barrier = threading.Barrier(2, timeout=2)
+
+    futures = [stage.submit(lambda n: barrier.wait() is not None and n * 2, n) for n in (1, 2)]
+    assert [future.result(timeout=2) for future in futures] == [2, 4]
+
+    with pytest.raises(ZeroDivisionError):
+        stage.submit(lambda: 1 / 0).result(timeout=2)
+
+    stats = stage.get_stats()
+    assert stats['completed'] == 2
+    assert stats['failed'] == 1
+    assert stats['in_flight'] == 0
+    assert stats['queued'] == 0
+
+
+def test_full_stage_rejects_jobs():
+    """Jobs beyond the queue limit are rejected with a retry hint"""
+    stage = Stage('tts', workers=1, max_queue_size=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    running = stage.submit(lambda: started.set() or release.wait(2))
+    started.wait(2)
+    queued = stage.submit(lambda: 'queued')
+    with pytest.raises(Overloaded) as excinfo:
+        stage.submit(lambda: 'rejected')
+    assert excinfo.value.retry_after >= 1
+
+    release.set()
+    assert running.result(timeout=2) is True
+    assert queued.result(timeout=2) == 'queued'
+    assert stage.get_stats()['rejected'] == 1
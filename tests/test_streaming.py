@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental sentence splitting used to feed TTS while the LLM streams
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from streaming import SentenceSplitter, iter_sentences, prefetch, stream_chat_response, strip_prefix
+from conversation_memory import BudgetedConversationMemory
+from ollama_client import OllamaChatClient
+
+
+def test_sentences_emitted_as_they_complete():
+    """A sentence is released as soon as the whitespace after its punctuation arrives"""
+    splitter = SentenceSplitter()
+    assert splitter.feed("Hello there") == []
+    assert splitter.feed("! How are") == ["Hello there!"]
+    assert splitter.feed(" you") == []
+    assert splitter.feed("? Fine.") == ["How are you?"]
+    assert splitter.flush() == ["Fine."]
+
+
+def test_token_stream_splits_into_sentences():
+    """Decimals and abbreviations do not end a sentence"""
+    tokens = ["It costs 3", ".5 dollars", ". Ask Dr", ". Smith about", " it!", " Thanks"]
+    assert list(iter_sentences(tokens)) == [
+        "It costs 3.5 dollars.",
+        "Ask Dr. Smith about it!",
+        "Thanks",
+    ]
+
+
+def test_strip_prefix_across_chunks():
+    """The "Assistant:" prefix is removed even when split over several tokens"""
+    assert "".join(strip_prefix(["Assis", "tant: ", "Hi!"])) == "Hi!"
+    assert "".join(strip_prefix(["As", "sorted things."])) == "Assorted things."
+    assert "".join(strip_prefix(["Hello"])) == "Hello"
+
+
+def test_prefetch_preserves_order_and_errors():
+    """Items come back in order and producer exceptions surface in the consumer"""
+    assert list(prefetch(iter(range(5)))) == [0, 1, 2, 3, 4]
+
+    def failing():
+        yield 1
+        raise ValueError("boom")
+
+    items = []
+    try:
+        for item in prefetch(failing()):
+            items.append(item)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("producer error was swallowed")
+    assert items == [1]
+
+
+def test_stream_chat_response_appends_turn_to_memory():
+    """The chat request extends the stored history, and the stripped reply is saved"""
+    class FakeClient(OllamaChatClient):
+        def stream_chat(self, messages):
+            self.sent = messages
+            yield from ["Assistant:", " Hi", " there."]
+
+    client = FakeClient("test", system_prompt="Be brief.")
+    memory = BudgetedConversationMemory()
+    memory.save_turn("Earlier question", "Earlier answer")
+
+    assert "".join(stream_chat_response(client, memory, "Hello")).strip() == "Hi there."
+    assert [message["content"] for message in client.sent] == ["Be brief.", "Earlier question", "Earlier answer", "Hello"]
+    assert memory.messages()[-2:] == [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Hi there."}]
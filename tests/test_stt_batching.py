@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the confidence rules of the short-utterance Whisper path
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from stt_batching import is_silent, log_mel_batch, needs_fallback
+
+
+def result(no_speech_prob=0.0, avg_logprob=-0.2, compression_ratio=1.2):
+    return SimpleNamespace(no_speech_prob=no_speech_prob, avg_logprob=avg_logprob, compression_ratio=compression_ratio)
+
+
+def test_only_doubtful_speech_is_retried():
+    """Confident decodes and silence are kept; repetitive or unlikely speech is retried"""
+    assert not needs_fallback(result())
+    assert needs_fallback(result(compression_ratio=3.0))
+    assert needs_fallback(result(avg_logprob=-1.5))
+
+    silence = result(no_speech_prob=0.9, avg_logprob=-1.5)
+    assert is_silent(silence)
+    assert not needs_fallback(silence)
+    assert not is_silent(result(no_speech_prob=0.9))
+
+
+def test_batched_mel_matches_single_utterances():
+    """A loud utterance in the batch does not change the features of a quiet one"""
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("whisper")
+    rng = np.random.default_rng(0)
+    quiet = (0.01 * rng.standard_normal(16000)).astype(np.float32)
+    loud = (0.9 * rng.standard_normal(32000)).astype(np.float32)
+
+    batch = log_mel_batch([quiet, loud])
+    assert torch.allclose(batch[0], log_mel_batch([quiet])[0])
+    assert torch.allclose(batch[1], log_mel_batch([loud])[0])
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the pluggable speech-to-text engine interface, using a stub engine
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from stt_batching import BatchTranscriber
+from stt_engines import STTEngine, WhisperEngine, FasterWhisperEngine, create_stt_engine
+
+SAMPLE_RATE = 16000
+
+
+class StubEngine(STTEngine):
+    """'Hears' one word per second of audio, named after that second's sample value"""
+
+    name = "stub"
+
+    def load(self, phase=None):
+        self.model = "loaded"
+        return self
+
+    def transcribe_words(self, audio, initial_prompt=None):
+        return [(i + 1.0, f" word{int(audio[i * SAMPLE_RATE])}") for i in range(len(audio) // SAMPLE_RATE)]
+
+    def transcribe(self, audio, initial_prompt=None):
+        return "".join(word for _, word in self.transcribe_words(audio)).strip()
+
+
+def test_engine_batches_and_streams_through_the_interface():
+    """Batching and streaming work for any engine that implements transcribe and transcribe_words"""
+    engine = StubEngine().load()
+    audios = [np.repeat(np.arange(n, dtype=np.float32), SAMPLE_RATE) for n in (1, 3)]
+
+    assert engine.transcribe_batch(audios) == ["word0", "word0 word1 word2"]
+    assert BatchTranscriber(engine, max_wait=0.01).transcribe(audios[1]) == "word0 word1 word2"
+
+    chunks = [np.full(SAMPLE_RATE, i, dtype=np.float32) for i in range(3)]
+    partials = list(engine.stream(chunks))
+    assert partials[-1] == "word0 word1 word2"
+    assert len(partials) == len(chunks) + 1
+
+
+def test_incomplete_engines_cannot_be_created():
+    """An engine missing part of the interface fails when constructed, not on its first request"""
+    class NoWordTimings(STTEngine):
+        def load(self, phase=None):
+            return self
+
+        def transcribe(self, audio, initial_prompt=None):
+            return ""
+
+    with pytest.raises(TypeError):
+        NoWordTimings()
+
+
+def test_engine_is_selected_from_config():
+    """The stt section picks the engine and passes it only the options it accepts"""
+    engine = create_stt_engine({'model': 'tiny.en', 'fp16': False, 'precision': 'int8'})
+    assert isinstance(engine, WhisperEngine)
+    assert (engine.model_name, engine.precision) == ('tiny.en', 'int8')
+
+    engine = create_stt_engine({'engine': 'faster-whisper', 'compute_type': 'int8', 'fp16': False}, device='cpu')
+    assert isinstance(engine, FasterWhisperEngine)
+    assert (engine.device, engine.precision, engine.model) == ('cpu', 'int8', None)
+
+    with pytest.raises(ValueError):
+        create_stt_engine({'engine': 'missing'})
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for the TTS engine interface and the routing policy, using a stub engine
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from tts_engines import TTSEngine, TTSRoutingPolicy, create_fast_tts_engine
+
+SAMPLE_RATE = 100
+
+
+class StubEngine(TTSEngine):
+    """Speaks each word as one tenth of a second of ones"""
+
+    def synthesize(self, text, voice_preset=None, speed=None):
+        return SAMPLE_RATE, np.ones(len(text.split()) * SAMPLE_RATE // 10, dtype=np.float32)
+
+
+def test_long_form_synthesis_falls_back_to_per_sentence_synthesis():
+    """Engines only implementing synthesize still get batching and long-form synthesis"""
+    sample_rate, audio = StubEngine().long_form_synthesize("One two. Three four five.")
+    assert sample_rate == SAMPLE_RATE
+    # 5 words of speech plus a quarter-second pause after each of the 2 sentences
+    assert len(audio) == 5 * 10 + 2 * 25
+    assert audio.sum() == 5 * 10
+
+
+def test_routing_policy():
+    """Previews stay on Bark; system prompts, short standalone texts and over-budget requests go fast"""
+    policy = TTSRoutingPolicy(max_fast_words=3, latency_budget=5.0)
+
+    assert policy.use_fast("Sure thing.")
+    assert not policy.use_fast("Sure thing.", kind="reply")
+    assert policy.use_fast("Your timer has been set for ten minutes.", kind="system")
+    assert not policy.use_fast("Here is a longer reply about the weather.", kind="reply", expected_seconds=2.0)
+    assert policy.use_fast("Here is a longer reply about the weather.", kind="reply", expected_seconds=8.0)
+    assert not policy.use_fast("Hi.", kind="preview", expected_seconds=8.0)
+
+
+def test_fast_engine_is_optional():
+    """No fast engine is created unless one is configured"""
+    assert create_fast_tts_engine({}) is None
+    assert create_fast_tts_engine({'engine': 'piper', 'model': 'voice.onnx'}).model == 'voice.onnx'
+    with pytest.raises(ValueError):
+        create_fast_tts_engine({'engine': 'missing'})
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for voice activity detection and endpointing
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from vad import Endpointer, trim_silence
+
+SAMPLE_RATE = 16000
+rng = np.random.default_rng(0)
+
+
+def noise(seconds):
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 0.003).astype(np.float32)
+
+
+def voice(seconds):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 180 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))).astype(np.float32) + noise(seconds)
+
+
+def test_endpointer_finds_each_utterance():
+    """Two utterances separated by a pause come out as two trimmed clips"""
+    stream = np.concatenate([noise(1.0), voice(1.2), noise(1.5), voice(0.5), noise(1.0)])
+    endpointer = Endpointer(sample_rate=SAMPLE_RATE)
+
+    events = []
+    for i in range(0, len(stream), 1600):  # 100 ms chunks, like a microphone callback
+        events += endpointer.process(stream[i:i + 1600])
+
+    assert [event for event, _ in events] == ["start", "end", "start", "end"]
+    first, second = events[1][1], events[3][1]
+    assert 1.2 <= len(first) / SAMPLE_RATE <= 1.6
+    assert 0.5 <= len(second) / SAMPLE_RATE <= 0.9
+    assert endpointer.flush() is None
+
+
+def test_silence_only_never_triggers():
+    """Background noise alone produces no utterance"""
+    endpointer = Endpointer(sample_rate=SAMPLE_RATE)
+    assert endpointer.process(noise(3.0)) == []
+
+
+def test_trim_silence_keeps_only_speech_and_padding():
+    """Leading and trailing silence are removed from a complete clip"""
+    trimmed = trim_silence(np.concatenate([noise(1.0), voice(1.0), noise(1.0)]), SAMPLE_RATE)
+    assert 1.0 <= len(trimmed) / SAMPLE_RATE <= 1.4
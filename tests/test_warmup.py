@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for model warm-up and readiness tracking
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from warmup import WarmupTracker
+
+
+def test_warm_up_all_reports_state_and_timings():
+    """Every component is warmed, timed, and failures are reported without raising"""
+    tracker = WarmupTracker()
+
+    def fail():
+        raise RuntimeError("model not found")
+
+    assert not tracker.warm_up_all({'stt': lambda: None, 'llm': (fail, "llama3.2:3b")})
+
+    status = tracker.get_status()
+    assert status['stt']['state'] == 'warm'
+    assert status['stt']['warmup_seconds'] >= 0
+    assert status['llm'] == {'state': 'failed', 'detail': 'llama3.2:3b', 'error': 'model not found',
+                             'warmup_seconds': status['llm']['warmup_seconds']}
+    assert tracker.is_ready(['stt'])
+    assert not tracker.is_ready()
+
+
+def test_background_warm_up_swaps_in_replacement():
+    """A replacement is reported separately until it is warm, then takes over the component's status"""
+    tracker = WarmupTracker()
+    tracker.warm_up('llm', lambda: None, detail="llama3.2:3b")
+
+    thread = tracker.warm_up_in_background('llm_next', lambda: None, detail="qwen2.5:3b",
+                                           on_success=lambda: tracker.promote('llm_next', 'llm'))
+    thread.join(timeout=2)
+
+    status = tracker.get_status()
+    assert 'llm_next' not in status
+    assert status['llm']['detail'] == "qwen2.5:3b"
+    assert tracker.is_ready(['llm'])
@@ -7,30 +7,55 @@ Flask application providing web interface for the voice assistant
 import os
 import sys
 import json
+import time
+from contextlib import nullcontext
+import uuid
 import base64
 import logging
 from io import BytesIO
+import threading
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, send_file
+from queue import Queue
+from collections import deque
+from concurrent.futures import Future
+from urllib.parse import quote
+from flask import Flask, Request, Response, g, render_template, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
+from flask_sock import Sock
+from simple_websocket import ConnectionClosed
 import numpy as np
-import whisper
-import soundfile as sf
-import tempfile
 
 # Add the src directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 # Import our voice assistant components
-from tts_service import TextToSpeechService
-from langchain.memory import ConversationBufferMemory
-from langchain.chains import ConversationChain
-from langchain.prompts import PromptTemplate
-from langchain_community.llms import Ollama
+from model_registry import ModelRegistry, load_tts, load_llm, set_torch_threads
+from stt_engines import create_stt_engine
+from tts_engines import create_fast_tts_engine, TTSRoutingPolicy
+from streaming import SentenceSplitter, stream_chat_response
+from batching import MicroBatcher, Overloaded
+from stt_batching import BatchTranscriber
+from pipeline import Stage
+from audio_cache import AudioCache
+from audio_io import preprocess_upload, encode_wav, resample
+from vad import Endpointer
+from conversation_memory import BudgetedConversationMemory, SessionStore
+from ollama_client import OllamaChatClient
+from warmup import WarmupTracker
+from config import load_config, get_setting
+
+class InMemoryRequest(Request):
+    """Request that keeps uploaded files in memory instead of spooling large ones to disk"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return BytesIO()
 
 # Initialize Flask app
 app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+app.request_class = InMemoryRequest
+app.config['MAX_CONTENT_LENGTH'] = 25 * 1024 * 1024  # Bounds the memory used per upload
+CORS(app, expose_headers=['X-User-Text', 'X-Assistant-Response'])  # Enable CORS for all routes
+sock = Sock(app)  # WebSocket routes
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -39,8 +64,48 @@ logger = logging.getLogger(__name__)
 # Initialize AI components
 stt = None
 tts = None
-chain = None
-conversation_memory = ConversationBufferMemory(ai_prefix="Assistant:")
+tts_batcher = None
+fast_tts = None  # Lightweight engine for short utterances (None unless configured)
+fast_tts_stage = None
+stt_batcher = None
+llm_stage = None
+llm = None
+models = ModelRegistry()  # Loads the models concurrently and records startup timings
+warmup = WarmupTracker()  # Per-component warm/cold state and warm-up timings
+pending_model = None  # LLM being warmed up to replace the current one
+shared_settings = None  # Settings shared between pre-forked worker processes (see serve.py)
+
+# Conversation history is kept per browser session and bounded in tokens
+SESSION_COOKIE = 'va_session'
+CONVERSATION_TOKEN_BUDGET = 600
+MAX_SESSIONS = 100
+SESSION_IDLE_TIMEOUT = 3600  # seconds
+sessions = SessionStore(
+    lambda: BudgetedConversationMemory(llm=llm, max_tokens=CONVERSATION_TOKEN_BUDGET),
+    max_sessions=MAX_SESSIONS,
+    idle_timeout=SESSION_IDLE_TIMEOUT,
+)
+
+# Model settings from config/config.yaml with the selected performance profile applied;
+# /api/settings can switch profiles at runtime
+config = load_config()
+AVAILABLE_PROFILES = list(config.get('profiles') or {})
+current_profile = config.get('profile')
+STT_SETTINGS = get_setting(config, 'stt', {})
+TTS_SETTINGS = get_setting(config, 'tts', {})
+TORCH_THREADS = get_setting(config, 'system.torch_threads', 0)
+
+# Bark speaks real replies; short utterances, system prompts and requests that would wait too
+# long for Bark go to the fast engine
+FAST_TTS_SETTINGS = get_setting(config, 'tts.fast', {})
+tts_routing = TTSRoutingPolicy(**get_setting(config, 'tts.routing', {}))
+FAST_TTS_WORKERS = 2
+FAST_TTS_MAX_QUEUE = 32
+
+# Ollama keeps the model, and the KV cache of each conversation's prefix, loaded this long between turns
+OLLAMA_BASE_URL = get_setting(config, 'ollama.base_url', "http://localhost:11434")
+OLLAMA_KEEP_ALIVE = "30m"
+OLLAMA_NUM_PREDICT = get_setting(config, 'ollama.num_predict')  # Reply length cap in tokens
 
 # Available LLM models
 AVAILABLE_MODELS = {
@@ -53,50 +118,394 @@ AVAILABLE_MODELS = {
 }
 
 # Current settings
-current_model = "llama3.2:3b"
-current_voice = "v2/en_speaker_6"  # Warm female, friendly
-current_speed = 1.2
+current_model = get_setting(config, 'ollama.model', "llama3.2:3b")
+current_voice = get_setting(config, 'tts.voice_preset', "v2/en_speaker_6")  # Warm female, friendly
+current_speed = get_setting(config, 'tts.speed', 1.2)
+
+# Concurrent /api/synthesize requests with the same voice and speed share one generate call
+TTS_MAX_BATCH_SIZE = 4
+TTS_BATCH_WAIT = 0.05  # seconds
+
+# Utterances from concurrent requests share Whisper's encoder and decoder passes
+STT_MAX_BATCH_SIZE = 8
+STT_BATCH_WAIT = 0.03  # seconds
+
+# Each model is driven by one scheduler thread. Conversation turns go ahead of voice previews,
+# and requests beyond these queue limits are turned away with 429 instead of waiting unboundedly
+PRIORITY_INTERACTIVE = 0
+PRIORITY_PREVIEW = 1
+STT_MAX_QUEUE = 32
+TTS_MAX_QUEUE = 64
+PREVIEW_MAX_QUEUE = 8
+
+# Conversation turns flow through three stages with their own workers and queues: the STT and
+# TTS schedulers above and this pool of LLM workers (match Ollama's OLLAMA_NUM_PARALLEL)
+LLM_WORKERS = 4
+LLM_MAX_QUEUE = 32
+
+# Synthesized audio cache (greetings, previews and other repeated phrases)
+AUDIO_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'cache', 'audio')
+AUDIO_CACHE_MEMORY_BYTES = 64 * 1024 * 1024
+AUDIO_CACHE_DISK_BYTES = 512 * 1024 * 1024
+
+def synthesize_batch(requests):
+    """Synthesizes a batch of (text, voice, speed) requests that share a voice and speed"""
+    _, voice, speed = requests[0]
+    # submit_speech already looked every text up in the audio cache
+    sample_rate, audio_arrays = tts.batch_synthesize([text for text, _, _ in requests], voice_preset=voice, speed=speed,
+                                                     check_cache=False)
+    return [(sample_rate, audio_array) for audio_array in audio_arrays]
+
+def synthesize_fast(text, speed):
+    """Speaks text with the fast engine, at Bark's sample rate so replies can mix both engines"""
+    sample_rate, audio_array = fast_tts.synthesize(text, speed=speed)
+    bark_rate = tts.model.generation_config.sample_rate
+    return bark_rate, resample(audio_array, sample_rate, bark_rate)
+
+def expected_tts_seconds():
+    """How long a new Bark request is expected to take, including the batches queued ahead of it"""
+    stats = tts_batcher.get_stats()
+    return stats['average_batch_seconds'] * (stats['queued'] // TTS_MAX_BATCH_SIZE + 1)
 
-def initialize_ai_components():
-    """Initialize the AI components (STT, TTS, LLM)"""
-    global stt, tts, chain
+def use_fast_tts(text, kind):
+    """Whether the routing policy sends this text to the fast engine (never when none is loaded)"""
+    return bool(fast_tts) and tts_routing.use_fast(text, kind, expected_tts_seconds())
+
+def submit_speech(text, voice, speed, kind, priority, max_queued=None, fast=None):
+    """
+    Queues one piece of text for the engine the routing policy picks. Text already in Bark's
+    audio cache is served without queueing.
+    Args:
+        text (str): The text to speak.
+        voice (str): The Bark voice preset.
+        speed (float): Speed multiplier.
+        kind (str): The request kind, e.g. 'speech', 'reply', 'preview' or 'system'.
+        priority (int): Bark scheduling priority; lower values are served first.
+        max_queued (int, optional): Bark queue limit for this request.
+        fast (bool, optional): An engine choice already made for the whole turn; None asks the policy.
+    Returns:
+        concurrent.futures.Future: Resolves to the sample rate and audio array.
+    Raises:
+        Overloaded: The chosen engine's queue is full.
+    """
+    if fast is None:
+        fast = use_fast_tts(text, kind)
+    if fast:
+        return fast_tts_stage.submit(synthesize_fast, text, speed)
+    cached = tts.get_cached(text, voice_preset=voice, speed=speed)
+    if cached is not None:
+        future = Future()
+        future.set_result(cached)
+        return future
+    return tts_batcher.submit((text, voice, speed), priority=priority, max_queued=max_queued)
+
+def load_tts_service(phase, device=None, settings=None, audio_cache=None):
+    """Loads Bark, configured by the tts settings, with the audio cache and every voice prompt"""
+    settings = TTS_SETTINGS if settings is None else settings
+    tts = load_tts(
+        phase,
+        **({'device': device} if device else {}),
+        model_name=settings.get('model', "suno/bark-small"),
+        precision=settings.get('precision', "fp32"),
+        max_semantic_tokens=settings.get('max_semantic_tokens'),
+        audio_cache=audio_cache or AudioCache(
+            AUDIO_CACHE_DIR,
+            max_memory_bytes=AUDIO_CACHE_MEMORY_BYTES,
+            max_disk_bytes=AUDIO_CACHE_DISK_BYTES,
+        ),
+    )
+    with phase("voices"):
+        tts.preload_voices()
+    return tts
+
+def initialize_ai_components(device=None):
+    """
+    Initialize the AI components (STT, TTS, LLM), loading them concurrently
+    Args:
+        device (str, optional): Device for the STT engine and Bark. Defaults to CUDA when available.
+    """
+    global stt, tts, fast_tts, llm
     
     try:
-        # Initialize Speech-to-Text
-        logger.info("Loading Whisper model...")
-        stt = whisper.load_model("base.en")
-        
-        # Initialize Text-to-Speech
-        logger.info("Loading TTS model...")
-        tts = TextToSpeechService()
-        
-        # Initialize LLM Chain
-        logger.info("Setting up conversation chain...")
-        template = """
-        You are a helpful and friendly AI assistant. You are polite, respectful, and aim to provide concise responses of less than 50 words.
-        The conversation transcript is as follows:
-        {history}
-        And here is the user's follow-up: {input}
-        Your response:
-        """
-        
-        PROMPT = PromptTemplate(input_variables=["history", "input"], template=template)
-        llm = Ollama(model=current_model, base_url="http://localhost:11434")
+        logger.info(f"Loading Whisper, TTS and LLM models ({current_profile or 'default'} profile)...")
+        start = time.perf_counter()
+        set_torch_threads(TORCH_THREADS)
+        models.register('stt', create_stt_engine(STT_SETTINGS, device=device).load)
+        models.register('tts', lambda phase: load_tts_service(phase, device=device))
+        fast_engine = create_fast_tts_engine(FAST_TTS_SETTINGS)
+        if fast_engine:
+            models.register('tts_fast', fast_engine.load)
+        models.register('llm', lambda phase: load_llm(phase, OllamaChatClient(
+            current_model, base_url=OLLAMA_BASE_URL, keep_alive=OLLAMA_KEEP_ALIVE, num_predict=OLLAMA_NUM_PREDICT,
+        )))
+        models.start()
         
-        chain = ConversationChain(
-            prompt=PROMPT,
-            verbose=False,
-            memory=conversation_memory,
-            llm=llm,
-        )
+        # Each component becomes available as soon as its own load finishes
+        llm = models.get('llm')
+        stt = models.get('stt')
+        tts = models.get('tts')
+        if fast_engine:
+            try:
+                fast_tts = models.get('tts_fast')
+            except Exception as e:
+                logger.warning(f"Fast TTS engine unavailable, using Bark for everything: {e}")
         
-        logger.info("AI components initialized successfully!")
+        logger.info(f"AI components initialized successfully in {time.perf_counter() - start:.2f}s!")
         return True
         
     except Exception as e:
         logger.error(f"Failed to initialize AI components: {e}")
         return False
 
+def start_background_services():
+    """Starts the threads requests depend on (in each worker process when pre-forking)"""
+    global tts_batcher, stt_batcher, llm_stage, fast_tts_stage
+    llm_stage = Stage('llm', workers=LLM_WORKERS, max_queue_size=LLM_MAX_QUEUE)
+    if fast_tts:
+        fast_tts_stage = Stage('tts-fast', workers=FAST_TTS_WORKERS, max_queue_size=FAST_TTS_MAX_QUEUE)
+    stt_batcher = BatchTranscriber(stt, max_batch_size=STT_MAX_BATCH_SIZE, max_wait=STT_BATCH_WAIT,
+                                   max_queue_size=STT_MAX_QUEUE)
+    tts_batcher = MicroBatcher(
+        synthesize_batch,
+        max_batch_size=TTS_MAX_BATCH_SIZE,
+        max_wait=TTS_BATCH_WAIT,
+        key=lambda request: (request[1], request[2]),
+        name="tts-batcher",
+        max_queue_size=TTS_MAX_QUEUE,
+    )
+
+def warm_up_components():
+    """Runs a dummy inference through every model so the first request is as fast as later ones"""
+    tasks = {
+        'stt': (lambda: stt_batcher.transcribe(np.zeros(16000, dtype=np.float32)), f"{stt.name} {stt.model_name}"),
+        'tts': (tts.warm_up, tts.model_name),
+        'llm': (llm.warm_up, llm.model),
+    }
+    if fast_tts:
+        tasks['tts_fast'] = (fast_tts.warm_up, fast_tts.name)
+    return warmup.warm_up_all(tasks)
+
+def switch_model(model):
+    """Warms up a new LLM in the background; the current one keeps serving until it is ready"""
+    global pending_model
+    pending_model = model
+    candidate = OllamaChatClient(model, base_url=llm.base_url, system_prompt=llm.system_prompt,
+                                 keep_alive=llm.keep_alive, options=llm.options)
+
+    def activate():
+        global current_model, pending_model
+        if pending_model != model:
+            return  # Superseded by a later switch
+        previous = llm.model
+        # Every session shares this client, so they all move to the new model and keep their history
+        llm.model = current_model = model
+        pending_model = None
+        publish_settings()
+        warmup.promote('llm_next', 'llm')
+        if previous == model:
+            return
+        try:
+            OllamaChatClient(previous, base_url=llm.base_url).unload()
+        except Exception as e:
+            logger.warning(f"Failed to unload {previous}: {e}")
+
+    warmup.warm_up_in_background('llm_next', candidate.warm_up, detail=model, on_success=activate)
+
+def switch_profile(profile, switch_llm=True):
+    """
+    Switches to a performance profile. Reply length, beam size, Bark's token cap and thread
+    counts change at once; Whisper and Bark models that differ are loaded and warmed up in the
+    background while the current ones keep serving, as is a different Ollama model.
+    Args:
+        profile (str): The profile name.
+        switch_llm (bool, optional): Whether to switch the Ollama model (False when another worker already did).
+    """
+    global current_profile, STT_SETTINGS, TTS_SETTINGS
+    settings = load_config(profile=profile)
+    stt_settings = get_setting(settings, 'stt', {})
+    tts_settings = get_setting(settings, 'tts', {})
+    current_profile = profile
+    logger.info(f"Switching to the {profile} profile")
+
+    set_torch_threads(get_setting(settings, 'system.torch_threads', 0))
+    llm.num_predict = get_setting(settings, 'ollama.num_predict')
+    model = get_setting(settings, 'ollama.model', current_model)
+    if switch_llm and (model != llm.model or pending_model):
+        switch_model(model)
+
+    def without(section, *keys):
+        return {key: value for key, value in section.items() if key not in keys}
+
+    if without(stt_settings, 'beam_size') != without(STT_SETTINGS, 'beam_size'):
+        reload_stt(profile, stt_settings)
+    else:
+        stt.beam_size = stt_settings.get('beam_size')
+
+    bark = (tts_settings.get('model', "suno/bark-small"), tts_settings.get('precision', "fp32"))
+    if bark != (tts.model_name, tts.precision):
+        reload_tts(profile, tts_settings)
+    else:
+        tts.set_max_semantic_tokens(tts_settings.get('max_semantic_tokens'))
+    STT_SETTINGS, TTS_SETTINGS = stt_settings, tts_settings
+
+def reload_stt(profile, settings):
+    """Loads and warms up a new STT engine in the background, then hands it to the batcher"""
+    loaded = {}
+
+    def load():
+        engine = create_stt_engine(settings, device=stt.device).load()
+        engine.transcribe(np.zeros(16000, dtype=np.float32))
+        loaded['engine'] = engine
+
+    def activate():
+        global stt
+        if current_profile != profile:
+            return  # Superseded by a later switch
+        stt = stt_batcher.engine = loaded['engine']
+        warmup.promote('stt_next', 'stt')
+
+    detail = f"{settings.get('engine', 'whisper')} {settings.get('model', 'base.en')}"
+    warmup.warm_up_in_background('stt_next', load, detail=detail, on_success=activate)
+
+def reload_tts(profile, settings):
+    """Loads and warms up a new Bark model in the background, then swaps it in"""
+    loaded = {}
+
+    def load():
+        service = load_tts_service(lambda name: nullcontext(), device=tts.device, settings=settings,
+                                   audio_cache=tts.audio_cache)
+        service.set_default_voice(current_voice)
+        service.set_default_speed(current_speed)
+        service.warm_up()
+        loaded['tts'] = service
+
+    def activate():
+        global tts
+        if current_profile != profile:
+            return  # Superseded by a later switch
+        tts = loaded['tts']
+        warmup.promote('tts_next', 'tts')
+
+    warmup.warm_up_in_background('tts_next', load, detail=settings.get('model'), on_success=activate)
+
+def publish_settings():
+    """Makes this worker's settings visible to the other workers"""
+    if shared_settings is not None:
+        shared_settings.update(model=current_model, voice=current_voice, speed=current_speed, profile=current_profile)
+
+@app.before_request
+def sync_settings():
+    """Picks up settings changed through another worker process"""
+    global current_model, current_voice, current_speed
+    if shared_settings is None:
+        return
+    settings = shared_settings.copy()
+    if settings.get('profile', current_profile) != current_profile and llm:
+        # Each worker loads its own copy of any model the profile changes
+        switch_profile(settings['profile'], switch_llm=False)
+    current_voice = settings.get('voice', current_voice)
+    current_speed = settings.get('speed', current_speed)
+    if settings.get('model', current_model) != current_model:
+        # The worker that switched models already warmed it up in Ollama
+        current_model = settings['model']
+        if llm:
+            llm.model = current_model
+    if tts:
+        tts.set_default_voice(current_voice)
+        tts.set_default_speed(current_speed)
+
+def get_session_id():
+    """Returns the caller's conversation session id, issuing a new one if the cookie is missing"""
+    session_id = request.cookies.get(SESSION_COOKIE)
+    if not session_id:
+        session_id = g.get('new_session_id') or uuid.uuid4().hex
+        g.new_session_id = session_id
+    return session_id
+
+@app.after_request
+def set_session_cookie(response):
+    """Hands newly issued session ids to the browser"""
+    if g.get('new_session_id'):
+        response.set_cookie(SESSION_COOKIE, g.new_session_id, httponly=True, samesite='Lax')
+    return response
+
+
+def overloaded_response(e):
+    """429 response telling the client when to retry"""
+    logger.warning(f"Rejected request: {e}")
+    response = jsonify({'error': str(e), 'retry_after': e.retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+def error_payload(e):
+    """Error event data, with a retry hint when the server is overloaded"""
+    if isinstance(e, Overloaded):
+        return {'error': str(e), 'retry_after': e.retry_after}
+    return {'error': str(e)}
+
+def generate_spoken_response(memory, user_text):
+    """
+    Runs one conversation turn through the LLM and TTS stages and collects the result.
+    Args:
+        memory (BudgetedConversationMemory): The caller's conversation history.
+        user_text (str): The user's message.
+    Returns:
+        tuple: The full response text, the sample rate and the concatenated audio array (None
+        if nothing was spoken), and whether TTS was too busy to speak the whole reply.
+    Raises:
+        Overloaded: The LLM stage is full; nothing was saved, so the turn can be retried.
+    """
+    tokens = []
+    pieces = []
+    sample_rate = None
+    tts_unavailable = False
+
+    for event, data in conversation_events(memory, user_text):
+        if event == 'token':
+            tokens.append(data['text'])
+        elif event == 'audio':
+            sample_rate = data['sample_rate']
+            pieces += [data['audio_array'], np.zeros(int(0.25 * sample_rate))]
+        elif event == 'tts_unavailable':
+            # The turn is already in memory, so answer with the text rather than a retryable 429
+            tts_unavailable = True
+        elif event == 'error':
+            if 'retry_after' in data:
+                raise Overloaded(data['error'], data['retry_after'])
+            raise RuntimeError(data['error'])
+
+    response = "".join(tokens).strip()
+    if not pieces:
+        return response, None, None, tts_unavailable
+    return response, sample_rate, np.concatenate(pieces), tts_unavailable
+
+def read_uploaded_audio():
+    """Decodes, trims and normalizes the uploaded 'audio' file in-process into a 16 kHz float32 array"""
+    return preprocess_upload(request.files['audio'].read())
+
+def wants_binary_audio():
+    """True if the client asked for raw audio/wav instead of base64 JSON"""
+    if request.args.get('format') == 'wav':
+        return True
+    return request.accept_mimetypes.best == 'audio/wav'
+
+def audio_response(audio_array, sample_rate, **fields):
+    """
+    Returns synthesized audio either as a binary audio/wav body (text fields go in
+    X-* headers, URL-encoded) or as JSON with the WAV base64-encoded under 'audio'.
+    """
+    audio_bytes = encode_wav(audio_array, sample_rate)
+
+    if wants_binary_audio():
+        response = send_file(BytesIO(audio_bytes), mimetype='audio/wav')
+        for name, value in fields.items():
+            response.headers['X-' + name.replace('_', '-').title()] = quote(str(value))
+        return response
+
+    fields['audio'] = base64.b64encode(audio_bytes).decode('utf-8')
+    return jsonify(fields)
+
 @app.route('/')
 def index():
     """Main page route"""
@@ -108,9 +517,25 @@ def api_status():
     status = {
         'stt': stt is not None,
         'tts': tts is not None,
-        'llm': chain is not None,
+        'llm': llm is not None,
+        'ready': warmup.is_ready(['stt', 'tts', 'llm']),
+        'components': warmup.get_status(),
+        'startup': models.get_timings(),
+        'sessions': len(sessions),
+        'profile': current_profile,
+        'precision': {'stt': stt.precision if stt else None, 'tts': tts.precision if tts else None},
         'timestamp': datetime.now().isoformat()
     }
+    if tts and tts.audio_cache:
+        status['audio_cache'] = tts.audio_cache.get_stats()
+    if stt_batcher and llm_stage and tts_batcher:
+        status['pipeline'] = {
+            'stt': stt_batcher.get_stats(),
+            'llm': llm_stage.get_stats(),
+            'tts': tts_batcher.get_stats(),
+        }
+        if fast_tts_stage:
+            status['pipeline']['tts_fast'] = fast_tts_stage.get_stats()
     return jsonify(status)
 
 @app.route('/api/transcribe', methods=['POST'])
@@ -120,21 +545,13 @@ def api_transcribe():
         if 'audio' not in request.files:
             return jsonify({'error': 'No audio file provided'}), 400
         
-        audio_file = request.files['audio']
+        # Transcribe the audio without writing it to disk
+        text = stt_batcher.transcribe(read_uploaded_audio())
         
-        # Save the uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            audio_file.save(tmp_file.name)
-            
-            # Transcribe the audio
-            result = stt.transcribe(tmp_file.name, fp16=False)
-            text = result["text"].strip()
-            
-            # Clean up temporary file
-            os.unlink(tmp_file.name)
-            
-            return jsonify({'text': text})
+        return jsonify({'text': text})
             
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         logger.error(f"Transcription error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -149,12 +566,8 @@ def api_chat():
         if not user_input:
             return jsonify({'error': 'No message provided'}), 400
         
-        # Get response from the conversation chain
-        response = chain.predict(input=user_input)
-        
-        # Clean up response
-        if response.startswith("Assistant:"):
-            response = response[len("Assistant:"):].strip()
+        # Get response from the LLM, continuing the session's conversation
+        response = "".join(stream_chat_response(llm, sessions.get(get_session_id()), user_input)).strip()
         
         return jsonify({'response': response})
         
@@ -170,28 +583,23 @@ def api_synthesize():
         text = data.get('text', '')
         voice = data.get('voice', current_voice)
         speed = data.get('speed', current_speed)
+        kind = data.get('kind', 'speech')  # 'preview' keeps Bark for voice tests, 'system' prefers the fast engine
         
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
-        # Generate speech with custom voice and speed
-        sample_rate, audio_array = tts.synthesize(text, voice_preset=voice, speed=speed)
+        # Generate speech with custom voice and speed on the engine the routing policy
+        # picks; repeated phrases come straight from the cache
+        sample_rate, audio_array = submit_speech(
+            text, voice, float(speed), kind,
+            priority=PRIORITY_PREVIEW,
+            max_queued=PREVIEW_MAX_QUEUE,
+        ).result()
         
-        # Convert to WAV format
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            sf.write(tmp_file.name, audio_array, sample_rate)
-            
-            # Read the file as bytes
-            with open(tmp_file.name, 'rb') as f:
-                audio_bytes = f.read()
-            
-            # Clean up temporary file
-            os.unlink(tmp_file.name)
-            
-            # Return audio as base64
-            audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
-            return jsonify({'audio': audio_b64})
+        return audio_response(audio_array, sample_rate)
             
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         logger.error(f"TTS error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -203,47 +611,254 @@ def api_conversation():
         if 'audio' not in request.files:
             return jsonify({'error': 'No audio file provided'}), 400
         
-        audio_file = request.files['audio']
-        
         # Step 1: Transcribe audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            audio_file.save(tmp_file.name)
-            result = stt.transcribe(tmp_file.name, fp16=False)
-            user_text = result["text"].strip()
-            os.unlink(tmp_file.name)
+        user_text = stt_batcher.transcribe(read_uploaded_audio())
         
-        # Step 2: Get LLM response
-        response = chain.predict(input=user_text)
-        if response.startswith("Assistant:"):
-            response = response[len("Assistant:"):].strip()
-        
-        # Step 3: Synthesize response
-        sample_rate, audio_array = tts.synthesize(response, voice_preset=current_voice, speed=current_speed)
-        
-        # Convert to WAV format
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            sf.write(tmp_file.name, audio_array, sample_rate)
-            with open(tmp_file.name, 'rb') as f:
-                audio_bytes = f.read()
-            os.unlink(tmp_file.name)
+        # Steps 2 & 3: Stream the LLM response and synthesize it sentence by sentence
+        response, sample_rate, audio_array, tts_unavailable = generate_spoken_response(
+            sessions.get(get_session_id()), user_text
+        )
+        # When TTS is overloaded the reply is still returned (and already remembered), partly or not spoken
+        extra = {'tts_unavailable': True} if tts_unavailable else {}
+        if audio_array is None:
+            return jsonify({'user_text': user_text, 'assistant_response': response, 'audio': None, **extra})
         
         # Return complete conversation
-        audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
-        return jsonify({
-            'user_text': user_text,
-            'assistant_response': response,
-            'audio': audio_b64
-        })
+        return audio_response(
+            audio_array,
+            sample_rate,
+            user_text=user_text,
+            assistant_response=response,
+            **extra,
+        )
         
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         logger.error(f"Conversation error: {e}")
         return jsonify({'error': str(e)}), 500
 
+def sse_event(event, data):
+    """Formats one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def conversation_events(memory, user_text):
+    """
+    Runs a conversation turn through the pipeline and yields its results as (event, data)
+    pairs as soon as each is ready: 'token' for every LLM chunk, 'audio' for every
+    synthesized sentence (with 'sample_rate' and 'audio_array'), 'tts_unavailable' if TTS
+    is too busy to speak the rest of the reply, then 'done' (or 'error').
+    The LLM streams on an LLM stage worker, which hands each finished sentence straight to
+    the TTS scheduler, so no thread is tied up per request and Bark works on this turn's
+    first sentences while other turns are still in STT or the LLM.
+    Args:
+        memory (BudgetedConversationMemory): The caller's conversation history.
+        user_text (str): The transcribed user message.
+    Yields:
+        tuple: The event name and its JSON-serializable payload (audio arrays aside).
+    """
+    events = Queue()
+    voice, speed = current_voice, float(current_speed)
+
+    def run_llm():
+        splitter = SentenceSplitter()
+        fast = None  # The whole reply uses one engine, chosen at its first sentence
+        speaking = True
+
+        def speak(sentence):
+            nonlocal fast, speaking
+            if not speaking:
+                return
+            if fast is None:
+                fast = use_fast_tts(sentence, 'reply')
+            try:
+                future = submit_speech(sentence, voice, speed, 'reply', priority=PRIORITY_INTERACTIVE, fast=fast)
+            except Overloaded as e:
+                # Stop speaking, but let the LLM finish so the turn is still saved to memory; not an
+                # 'error', since retrying would repeat a turn that is already remembered
+                speaking = False
+                events.put(('tts_unavailable', {'error': str(e)}))
+                return
+            events.put(('sentence', (sentence, future)))
+            future.add_done_callback(lambda _: events.put(('synthesized', None)))
+
+        try:
+            for chunk in stream_chat_response(llm, memory, user_text):
+                events.put(('token', {'text': chunk}))
+                for sentence in splitter.feed(chunk):
+                    speak(sentence)
+            for sentence in splitter.flush():
+                speak(sentence)
+        except Exception as e:
+            logger.error(f"Streaming LLM error: {e}")
+            events.put(('error', error_payload(e)))
+        finally:
+            events.put(('llm_done', None))
+
+    try:
+        llm_stage.submit(run_llm)
+    except Overloaded as e:
+        yield 'error', error_payload(e)
+        yield 'done', {'assistant_response': ""}
+        return
+
+    pending = deque()  # Sentences waiting for their audio, in order
+    spoken = []
+    llm_done = False
+    while True:
+        event, data = events.get()
+        if event == 'sentence':
+            pending.append(data)
+        elif event == 'llm_done':
+            llm_done = True
+        elif event != 'synthesized':
+            yield event, data
+
+        # Release synthesized sentences in order
+        while pending and pending[0][1].done():
+            sentence, future = pending.popleft()
+            try:
+                sample_rate, audio_array = future.result()
+            except Exception as e:
+                logger.error(f"Streaming TTS error: {e}")
+                yield 'error', error_payload(e)
+                yield 'done', {'assistant_response': " ".join(spoken)}
+                return
+            yield 'audio', {'index': len(spoken), 'text': sentence, 'sample_rate': sample_rate, 'audio_array': audio_array}
+            spoken.append(sentence)
+
+        if llm_done and not pending:
+            yield 'done', {'assistant_response': " ".join(spoken)}
+            return
+
+@app.route('/api/conversation/stream', methods=['POST'])
+def api_conversation_stream():
+    """Streaming conversation: emits transcript, LLM text and per-sentence audio as server-sent events"""
+    if 'audio' not in request.files:
+        return jsonify({'error': 'No audio file provided'}), 400
+    
+    try:
+        audio_np = read_uploaded_audio()
+    except Exception as e:
+        logger.error(f"Audio decode error: {e}")
+        return jsonify({'error': str(e)}), 400
+    
+    # Transcribe before the stream starts, so an overloaded server can still answer 429
+    try:
+        user_text = stt_batcher.transcribe(audio_np, priority=PRIORITY_INTERACTIVE)
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        logger.error(f"Transcription error: {e}")
+        return jsonify({'error': str(e)}), 500
+    
+    memory = sessions.get(get_session_id())
+    
+    def generate():
+        try:
+            yield sse_event('transcript', {'text': user_text})
+            
+            for event, data in conversation_events(memory, user_text):
+                if event == 'audio':
+                    wav = encode_wav(data.pop('audio_array'), data.pop('sample_rate'))
+                    data['audio'] = base64.b64encode(wav).decode('utf-8')
+                yield sse_event(event, data)
+        except Exception as e:
+            logger.error(f"Streaming conversation error: {e}")
+            yield sse_event('error', error_payload(e))
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+@sock.route('/ws/voice')
+def ws_voice(ws):
+    """
+    Full-duplex voice session. The client streams 16 kHz mono int16 PCM as binary
+    messages; the server detects where each utterance ends, transcribes it and pushes
+    JSON events back, with each reply sentence's audio sent as a binary WAV message
+    right after its 'audio' event. Sending {"type": "end_utterance"} forces an endpoint.
+    """
+    send_lock = threading.Lock()
+    turns = Queue()
+    # The handshake carries the page's session cookie, so voice turns share its history
+    session_id = request.cookies.get(SESSION_COOKIE) or uuid.uuid4().hex
+
+    def send(message):
+        with send_lock:
+            ws.send(message)
+
+    def send_event(event, **data):
+        send(json.dumps({'type': event, **data}))
+
+    def run_turns():
+        # Turns are answered in order while the receive loop keeps listening
+        for utterance in iter(turns.get, None):
+            try:
+                user_text = stt_batcher.transcribe(utterance)
+                if not user_text:
+                    continue
+                send_event('transcript', text=user_text)
+                
+                for event, data in conversation_events(sessions.get(session_id), user_text):
+                    if event == 'audio':
+                        send_event('audio', index=data['index'], text=data['text'])
+                        send(encode_wav(data['audio_array'], data['sample_rate']))
+                    else:
+                        send_event(event, **data)
+            except ConnectionClosed:
+                return
+            except Exception as e:
+                logger.error(f"Voice session error: {e}")
+                try:
+                    send_event('error', **error_payload(e))
+                except ConnectionClosed:
+                    return
+
+    threading.Thread(target=run_turns, daemon=True).start()
+    endpointer = Endpointer()
+
+    try:
+        send_event('ready', sample_rate=16000)
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            
+            if isinstance(message, str):
+                try:
+                    control = json.loads(message)
+                except ValueError:
+                    control = None
+                if not isinstance(control, dict):
+                    send_event('error', error='Control messages must be JSON objects')
+                    continue
+                if control.get('type') == 'end_utterance':
+                    utterance = endpointer.flush()
+                    if utterance is not None:
+                        send_event('speech_end')
+                        turns.put(utterance)
+                continue
+            
+            pcm = np.frombuffer(message[:len(message) // 2 * 2], dtype=np.int16)
+            for event, utterance in endpointer.process(pcm.astype(np.float32) / 32768.0):
+                if event == 'start':
+                    send_event('speech_start')
+                else:
+                    send_event('speech_end')
+                    turns.put(utterance)
+    except ConnectionClosed:
+        pass
+    finally:
+        turns.put(None)
+
 @app.route('/api/reset', methods=['POST'])
 def api_reset():
-    """Reset conversation memory"""
+    """Reset the caller's conversation memory"""
     try:
-        conversation_memory.clear()
+        sessions.reset(get_session_id())
         return jsonify({'message': 'Conversation memory reset'})
     except Exception as e:
         logger.error(f"Reset error: {e}")
@@ -257,6 +872,8 @@ def api_get_settings():
             'current_model': current_model,
             'current_voice': current_voice,
             'current_speed': current_speed,
+            'current_profile': current_profile,
+            'available_profiles': AVAILABLE_PROFILES,
             'available_models': AVAILABLE_MODELS,
             'available_voices': tts.get_available_voices() if tts else {}
         }
@@ -268,11 +885,20 @@ def api_get_settings():
 @app.route('/api/settings', methods=['POST'])
 def api_update_settings():
     """Update settings"""
-    global current_model, current_voice, current_speed, chain
+    global current_model, current_voice, current_speed
     
     try:
         data = request.get_json()
         
+        # Switch the performance profile first, so an explicit model below still wins
+        if 'profile' in data:
+            if data['profile'] not in AVAILABLE_PROFILES:
+                return jsonify({'error': f"Unknown profile: {data['profile']}"}), 400
+            if not llm:
+                return jsonify({'error': 'Models are still loading'}), 503
+            if data['profile'] != current_profile:
+                switch_profile(data['profile'])
+        
         # Update voice settings
         if 'voice' in data:
             current_voice = data['voice']
@@ -287,30 +913,19 @@ def api_update_settings():
         
         # Update model settings
         if 'model' in data and data['model'] in AVAILABLE_MODELS:
-            current_model = data['model']
-            # Reinitialize the LLM chain with new model
-            if chain:
-                template = """
-                You are a helpful and friendly AI assistant. You are polite, respectful, and aim to provide concise responses of less than 50 words.
-                The conversation transcript is as follows:
-                {history}
-                And here is the user's follow-up: {input}
-                Your response:
-                """
-                
-                PROMPT = PromptTemplate(input_variables=["history", "input"], template=template)
-                llm = Ollama(model=current_model, base_url="http://localhost:11434")
-                
-                chain = ConversationChain(
-                    prompt=PROMPT,
-                    verbose=False,
-                    memory=conversation_memory,
-                    llm=llm,
-                )
+            if not llm:
+                current_model = data['model']
+            elif data['model'] != llm.model or pending_model:
+                # The current model keeps answering until the new one is warm
+                switch_model(data['model'])
+        
+        publish_settings()
         
         return jsonify({
             'message': 'Settings updated successfully',
             'current_model': current_model,
+            'pending_model': pending_model,
+            'current_profile': current_profile,
             'current_voice': current_voice,
             'current_speed': current_speed
         })
@@ -326,6 +941,12 @@ if __name__ == '__main__':
     if not initialize_ai_components():
         logger.error("Failed to initialize AI components. Exiting...")
         sys.exit(1)
+    start_background_services()
+    
+    # Pay the first-inference costs before accepting requests
+    logger.info("Warming up models...")
+    if not warm_up_components():
+        logger.warning(f"Some components failed to warm up: {warmup.get_status()}")
     
     # Start the Flask server
     app.run(
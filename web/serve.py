@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Pre-fork production server for the Web Voice Assistant
+
+The master process loads Whisper, Bark and the LLM client once, then forks worker
+processes that share the model weights copy-on-write and accept connections from one
+listening socket. Each worker serves requests on its own threads with its own GIL.
+
+Usage: python web/serve.py --workers 4 --torch-threads 2
+"""
+
+import os
+import gc
+import sys
+import signal
+import socket
+import logging
+import argparse
+import multiprocessing
+
+import torch
+from werkzeug.serving import make_server
+
+import app as server
+from conversation_memory import SharedSessionStore
+from model_registry import set_torch_threads
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    """Parses the command line"""
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Pre-fork Voice Assistant web server")
+    parser.add_argument("--host", default="0.0.0.0", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=5000, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=max(1, cpus // 4), help="Number of worker processes")
+    parser.add_argument("--torch-threads", type=int, default=0,
+                        help="Intra-op torch threads per worker when the profile's system.torch_threads is 0 "
+                             "(default: CPU cores divided by workers)")
+    parser.add_argument("--backlog", type=int, default=128, help="Listen backlog of the shared socket")
+    args = parser.parse_args()
+    args.torch_threads = args.torch_threads or max(1, cpus // args.workers)
+    return args
+
+
+def bind_socket(host, port, backlog):
+    """Creates the listening socket every worker accepts from"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def share_weights():
+    """
+    Moves the model weights into shared memory. Forked workers then map the same pages
+    even if something writes next to them, rather than relying on copy-on-write alone.
+    """
+    server.stt.share_memory()
+    server.tts.model.share_memory()
+
+
+def run_worker(index, sock, args):
+    """Worker process body: per-process setup, warm-up, then serve until terminated"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The master handles Ctrl+C
+    gc.enable()
+
+    # The profile's system.torch_threads wins; --torch-threads is what 0 means in a worker
+    set_torch_threads(server.TORCH_THREADS, default=args.torch_threads)
+    server.llm.reconnect()  # Don't share the master's pooled HTTP connections
+    # Engines whose runtimes keep threads (CTranslate2, onnxruntime) reload in the worker
+    server.stt.after_fork()
+    if server.fast_tts:
+        server.fast_tts.after_fork()
+    server.start_background_services()
+    # Warm up here rather than in the master: torch's OpenMP thread pool does not survive fork
+    server.warm_up_components()
+
+    httpd = make_server(args.host, args.port, server.app, threaded=True, fd=sock.fileno())
+    logger.info(f"Worker {index} (pid {os.getpid()}) serving with {torch.get_num_threads()} torch threads")
+    httpd.serve_forever()
+
+
+def spawn_worker(index, sock, args):
+    """Forks one worker and returns its pid"""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(index, sock, args)
+        except Exception as e:
+            logger.error(f"Worker {index} crashed: {e}")
+        finally:
+            os._exit(1)
+    return pid
+
+
+def main():
+    args = parse_args()
+    logger.info(f"Starting pre-fork Voice Assistant server with {args.workers} workers...")
+
+    # Start the session manager before loading models so its process stays small
+    manager = multiprocessing.Manager()
+    server.sessions = SharedSessionStore(
+        server.sessions.factory,
+        manager.dict(),
+        max_sessions=server.MAX_SESSIONS,
+        idle_timeout=server.SESSION_IDLE_TIMEOUT,
+        lock=manager.Lock(),
+    )
+    server.shared_settings = manager.dict()
+    server.publish_settings()
+
+    # A CUDA context does not survive fork, so pre-forked workers run the models on the CPU
+    if torch.cuda.is_available():
+        logger.warning("Pre-fork mode runs Whisper and Bark on the CPU; use app.py for single-process GPU serving")
+
+    # Keep the garbage collector out of loading and freeze everything before forking, so its
+    # bookkeeping writes don't copy the pages the workers share
+    gc.disable()
+    if not server.initialize_ai_components(device="cpu"):
+        logger.error("Failed to initialize AI components. Exiting...")
+        sys.exit(1)
+    share_weights()
+    sock = bind_socket(args.host, args.port, args.backlog)
+    gc.collect()
+    gc.freeze()
+
+    workers = {spawn_worker(index, sock, args): index for index in range(args.workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # Replace workers that die, from the pristine master so they share the weights too
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = workers.pop(pid, None)
+        if index is not None and not stopping:
+            logger.warning(f"Worker {index} (pid {pid}) exited with status {status}; restarting it")
+            workers[spawn_worker(index, sock, args)] = index
+
+    manager.shutdown()
+    logger.info("Server stopped")
+
+
+if __name__ == "__main__":
+    main()
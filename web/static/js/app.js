@@ -27,6 +27,7 @@ class VoiceAssistant {
         this.toggleModeBtn = document.getElementById('toggle-mode');
         this.settingsBtn = document.getElementById('settings-btn');
         this.ttsModeBtn = document.getElementById('tts-mode-btn');
+        this.liveBtn = document.getElementById('live-btn');
         this.chatMessages = document.getElementById('chat-messages');
         this.loadingOverlay = document.getElementById('loading-overlay');
         this.loadingText = document.getElementById('loading-text');
@@ -65,6 +66,13 @@ class VoiceAssistant {
         // TTS state
         this.currentTTSAudio = null;
         this.isPlaying = false;
+        
+        // Queue of streamed reply clips, played back to back
+        this.playbackQueue = [];
+        this.isPlayingQueue = false;
+        
+        // Hands-free WebSocket session
+        this.liveSession = null;
     }
 
     setupEventListeners() {
@@ -91,6 +99,7 @@ class VoiceAssistant {
         // Action buttons
         this.resetBtn.addEventListener('click', () => this.resetConversation());
         this.toggleModeBtn.addEventListener('click', () => this.toggleMode());
+        this.liveBtn.addEventListener('click', () => this.toggleLiveSession());
         this.settingsBtn.addEventListener('click', () => this.openSettings());
         
         // Settings modal
@@ -101,13 +110,13 @@ class VoiceAssistant {
         this.speedSlider.addEventListener('input', (e) => this.updateSpeedValue(e.target.value));
         
         // TTS Mode
-        this.ttsModeBtn.addEventListener('click', () =3e this.openTTSMode());
-        this.closeTTSBtn.addEventListener('click', () =3e this.closeTTSMode());
-        this.closeTTSFooterBtn.addEventListener('click', () =3e this.closeTTSMode());
-        this.playTTSBtn.addEventListener('click', () =3e this.playTTS());
-        this.stopTTSBtn.addEventListener('click', () =3e this.stopTTS());
-        this.downloadTTSBtn.addEventListener('click', () =3e this.downloadTTS());
-        this.ttsSpeedSlider.addEventListener('input', (e) =3e this.updateTTSSpeedValue(e.target.value));
+        this.ttsModeBtn.addEventListener('click', () => this.openTTSMode());
+        this.closeTTSBtn.addEventListener('click', () => this.closeTTSMode());
+        this.closeTTSFooterBtn.addEventListener('click', () => this.closeTTSMode());
+        this.playTTSBtn.addEventListener('click', () => this.playTTS());
+        this.stopTTSBtn.addEventListener('click', () => this.stopTTS());
+        this.downloadTTSBtn.addEventListener('click', () => this.downloadTTS());
+        this.ttsSpeedSlider.addEventListener('input', (e) => this.updateTTSSpeedValue(e.target.value));
         
         // Close modal when clicking outside
         this.settingsModal.addEventListener('click', (e) => {
@@ -128,8 +137,10 @@ class VoiceAssistant {
             const response = await fetch('/api/status');
             const status = await response.json();
             
-            if (status.stt && status.tts && status.llm) {
+            if (status.stt && status.tts && status.llm && status.ready) {
                 this.setStatus('Online', true);
+            } else if (status.stt && status.tts && status.llm) {
+                this.setStatus('Warming Up...', false);
             } else {
                 this.setStatus('Services Loading...', false);
             }
@@ -176,6 +187,12 @@ class VoiceAssistant {
         
         this.chatMessages.appendChild(messageDiv);
         this.chatMessages.scrollTop = this.chatMessages.scrollHeight;
+        return text;
+    }
+
+    appendToMessage(textElement, content) {
+        textElement.textContent += content;
+        this.chatMessages.scrollTop = this.chatMessages.scrollHeight;
     }
 
     async startRecording() {
@@ -222,41 +239,131 @@ class VoiceAssistant {
     async processRecording() {
         if (this.recordedChunks.length === 0) return;
         
-        const blob = new Blob(this.recordedChunks, { type: 'audio/wav' });
+        const mimeType = this.mediaRecorder.mimeType || 'audio/webm';
+        const blob = new Blob(this.recordedChunks, { type: mimeType });
         const formData = new FormData();
-        formData.append('audio', blob, 'recording.wav');
+        formData.append('audio', blob, 'recording.' + (mimeType.includes('ogg') ? 'ogg' : 'webm'));
         
         this.showLoading('Processing voice...');
         
         try {
-            const response = await fetch('/api/conversation', {
+            // Server-sent events: transcript, then LLM text, then audio per sentence
+            const response = await fetch('/api/conversation/stream', {
                 method: 'POST',
                 body: formData
             });
             
+            if (response.status === 429) {
+                throw new Error(`Server is busy, please try again in ${response.headers.get('Retry-After') || 'a few'} seconds`);
+            }
             if (!response.ok) {
                 throw new Error('Failed to process audio');
             }
             
-            const result = await response.json();
-            
-            // Add messages to chat
-            this.addMessage(result.user_text, true);
-            this.addMessage(result.assistant_response, false);
-            
-            // Play audio response
-            if (result.audio) {
-                this.playAudio(result.audio);
-            }
+            let assistantText = null;
+            await this.readEventStream(response, (event, data) => {
+                if (event === 'transcript') {
+                    this.addMessage(data.text, true);
+                    this.showLoading('Generating response...');
+                } else if (event === 'token') {
+                    if (!assistantText) {
+                        this.hideLoading();
+                        assistantText = this.addMessage('', false);
+                    }
+                    this.appendToMessage(assistantText, data.text);
+                } else if (event === 'audio') {
+                    // Start playing the first sentence while later ones are still synthesizing
+                    this.enqueueAudio(this.base64ToBlob(data.audio, 'audio/wav'));
+                } else if (event === 'error') {
+                    throw new Error(data.error);
+                }
+            });
             
         } catch (error) {
             console.error('Error processing recording:', error);
-            this.addMessage('Sorry, I encountered an error processing your voice message.', false);
+            this.addMessage(error.message.startsWith('Server is busy')
+                ? error.message
+                : 'Sorry, I encountered an error processing your voice message.', false);
         } finally {
             this.hideLoading();
         }
     }
 
+    async readEventStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            
+            // Events are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                
+                let event = 'message';
+                let data = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) {
+                        event = line.slice(7);
+                    } else if (line.startsWith('data: ')) {
+                        data += line.slice(6);
+                    }
+                });
+                onEvent(event, data ? JSON.parse(data) : null);
+            }
+        }
+    }
+
+    enqueueAudio(audioBlob) {
+        this.playbackQueue.push(audioBlob);
+        if (!this.isPlayingQueue) {
+            this.playNextInQueue();
+        }
+    }
+
+    playNextInQueue() {
+        const audioBlob = this.playbackQueue.shift();
+        if (!audioBlob) {
+            this.isPlayingQueue = false;
+            return;
+        }
+        
+        this.isPlayingQueue = true;
+        const onEnded = () => this.playNextInQueue();
+        this.audioPlayer.addEventListener('ended', onEnded, { once: true });
+        this.playAudioBlob(audioBlob).then(started => {
+            if (!started) {
+                this.audioPlayer.removeEventListener('ended', onEnded);
+                this.playNextInQueue();
+            }
+        });
+    }
+
+    async toggleLiveSession() {
+        if (this.liveSession) {
+            this.liveSession.stop();
+            this.liveSession = null;
+            this.liveBtn.innerHTML = '<i class="fas fa-headset"></i> Live';
+            this.recordingIndicator.classList.remove('active');
+            return;
+        }
+        
+        try {
+            this.liveSession = new LiveVoiceSession(this);
+            await this.liveSession.start();
+            this.liveBtn.innerHTML = '<i class="fas fa-stop"></i> Stop Live';
+        } catch (error) {
+            console.error('Error starting live session:', error);
+            alert('Could not start a live session. Please ensure microphone permissions are granted.');
+            this.liveSession = null;
+        }
+    }
+
     async sendTextMessage() {
         const message = this.textInput.value.trim();
         if (!message) return;
@@ -293,38 +400,54 @@ class VoiceAssistant {
         }
     }
 
+    async synthesizeSpeech(text, voice, speed, kind = 'speech') {
+        // Binary WAV response: a third smaller than base64 JSON and no decode step
+        const response = await fetch('/api/synthesize?format=wav', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'audio/wav',
+            },
+            body: JSON.stringify({ 
+                text: text,
+                voice: voice,
+                speed: speed,
+                kind: kind
+            })
+        });
+        
+        if (response.status === 429) {
+            throw new Error(`Server is busy, please try again in ${response.headers.get('Retry-After') || 'a few'} seconds`);
+        }
+        if (!response.ok) {
+            throw new Error('Failed to generate speech');
+        }
+        return await response.blob();
+    }
+
     async generateSpeech(text) {
         try {
-            const response = await fetch('/api/synthesize', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ 
-                    text: text,
-                    voice: this.currentSettings.voice,
-                    speed: this.currentSettings.speed
-                })
-            });
-            
-            if (response.ok) {
-                const result = await response.json();
-                if (result.audio) {
-                    this.playAudio(result.audio);
-                }
-            }
+            const audioBlob = await this.synthesizeSpeech(text, this.currentSettings.voice, this.currentSettings.speed);
+            this.playAudioBlob(audioBlob);
         } catch (error) {
             console.error('Error generating speech:', error);
         }
     }
 
     playAudio(audioBase64) {
-        const audioBlob = this.base64ToBlob(audioBase64, 'audio/wav');
+        this.playAudioBlob(this.base64ToBlob(audioBase64, 'audio/wav'));
+    }
+
+    playAudioBlob(audioBlob) {
         const audioUrl = URL.createObjectURL(audioBlob);
         
+        if (this.audioPlayer.src.startsWith('blob:')) {
+            URL.revokeObjectURL(this.audioPlayer.src);
+        }
         this.audioPlayer.src = audioUrl;
-        this.audioPlayer.play().catch(error => {
+        return this.audioPlayer.play().then(() => true, error => {
             console.error('Error playing audio:', error);
+            return false;
         });
     }
 
@@ -482,24 +605,13 @@ class VoiceAssistant {
         const selectedSpeed = parseFloat(this.speedSlider.value);
         
         try {
-            const response = await fetch('/api/synthesize', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ 
-                    text: 'Hello! This is a test of the selected voice and speed.',
-                    voice: selectedVoice,
-                    speed: selectedSpeed
-                })
-            });
-            
-            if (response.ok) {
-                const result = await response.json();
-                if (result.audio) {
-                    this.playAudio(result.audio);
-                }
-            }
+            const audioBlob = await this.synthesizeSpeech(
+                'Hello! This is a test of the selected voice and speed.',
+                selectedVoice,
+                selectedSpeed,
+                'preview'
+            );
+            this.playAudioBlob(audioBlob);
         } catch (error) {
             console.error('Error testing voice:', error);
             alert('Failed to test voice');
@@ -620,32 +732,14 @@ class VoiceAssistant {
         this.isPlaying = true;
         
         try {
-            const response = await fetch('/api/synthesize', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ 
-                    text: text,
-                    voice: selectedVoice,
-                    speed: selectedSpeed
-                })
-            });
-            
-            if (response.ok) {
-                const result = await response.json();
-                if (result.audio) {
-                    this.currentTTSAudio = result.audio;
-                    this.playAudio(result.audio);
-                    
-                    // Re-enable play button when audio finishes
-                    this.audioPlayer.addEventListener('ended', () => {
-                        this.resetTTSButtons();
-                    }, { once: true });
-                }
-            } else {
-                throw new Error('Failed to generate speech');
-            }
+            const audioBlob = await this.synthesizeSpeech(text, selectedVoice, selectedSpeed);
+            this.currentTTSAudio = audioBlob;
+            this.playAudioBlob(audioBlob);
+            
+            // Re-enable play button when audio finishes
+            this.audioPlayer.addEventListener('ended', () => {
+                this.resetTTSButtons();
+            }, { once: true });
         } catch (error) {
             console.error('Error playing TTS:', error);
             alert('Failed to generate speech');
@@ -681,35 +775,17 @@ class VoiceAssistant {
         this.downloadTTSBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Generating...';
         
         try {
-            const response = await fetch('/api/synthesize', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ 
-                    text: text,
-                    voice: selectedVoice,
-                    speed: selectedSpeed
-                })
-            });
-            
-            if (response.ok) {
-                const result = await response.json();
-                if (result.audio) {
-                    // Create download link
-                    const audioBlob = this.base64ToBlob(result.audio, 'audio/wav');
-                    const url = URL.createObjectURL(audioBlob);
-                    const a = document.createElement('a');
-                    a.href = url;
-                    a.download = `tts_audio_${Date.now()}.wav`;
-                    document.body.appendChild(a);
-                    a.click();
-                    document.body.removeChild(a);
-                    URL.revokeObjectURL(url);
-                }
-            } else {
-                throw new Error('Failed to generate audio');
-            }
+            const audioBlob = await this.synthesizeSpeech(text, selectedVoice, selectedSpeed);
+            
+            // Create download link
+            const url = URL.createObjectURL(audioBlob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `tts_audio_${Date.now()}.wav`;
+            document.body.appendChild(a);
+            a.click();
+            document.body.removeChild(a);
+            URL.revokeObjectURL(url);
         } catch (error) {
             console.error('Error downloading TTS:', error);
             alert('Failed to generate audio for download');
@@ -720,6 +796,119 @@ class VoiceAssistant {
     }
 }
 
+// Converts a stream of float samples to another rate. Each output sample is the
+// average of the input it spans, which also filters out most aliasing when the
+// microphone runs at 44.1 or 48 kHz; state carries over between buffers.
+class PcmResampler {
+    constructor(inputRate, outputRate) {
+        this.ratio = inputRate / outputRate;
+        this.position = 0;
+        this.sum = 0;
+        this.count = 0;
+    }
+
+    process(samples) {
+        if (this.ratio === 1) return samples;
+        const out = new Float32Array(Math.ceil((samples.length + this.position) / this.ratio));
+        let written = 0;
+        for (let i = 0; i < samples.length; i++) {
+            this.sum += samples[i];
+            this.count++;
+            this.position++;
+            if (this.position < this.ratio) continue;
+            const value = this.sum / this.count;
+            // Below the output rate a sample is repeated until it spans a whole input sample
+            while (this.position >= this.ratio) {
+                out[written++] = value;
+                this.position -= this.ratio;
+            }
+            this.sum = 0;
+            this.count = 0;
+        }
+        return out.subarray(0, written);
+    }
+}
+
+// Hands-free conversation over a WebSocket: streams 16 kHz PCM up, the server
+// detects the end of each utterance and streams reply text and audio back
+class LiveVoiceSession {
+    constructor(assistant) {
+        this.assistant = assistant;
+        this.socket = null;
+        this.audioContext = null;
+        this.stream = null;
+        this.processor = null;
+        this.assistantText = null;
+    }
+
+    async start() {
+        // Echo cancellation keeps the assistant's own replies from triggering the server VAD
+        this.stream = await navigator.mediaDevices.getUserMedia({
+            audio: { echoCancellation: true, noiseSuppression: true }
+        });
+        // Capture at the device's own rate: Firefox cannot connect a microphone to a
+        // context running at a different rate, so the 16 kHz conversion happens here
+        this.audioContext = new AudioContext();
+        const source = this.audioContext.createMediaStreamSource(this.stream);
+        this.processor = this.audioContext.createScriptProcessor(4096, 1, 1);
+        const resampler = new PcmResampler(this.audioContext.sampleRate, 16000);
+        
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        this.socket = new WebSocket(`${protocol}//${window.location.host}/ws/voice`);
+        this.socket.binaryType = 'blob';
+        this.socket.onmessage = (message) => this.handleMessage(message);
+        this.socket.onclose = () => {
+            if (this.assistant.liveSession === this) {
+                this.assistant.toggleLiveSession();
+            }
+        };
+        
+        this.processor.onaudioprocess = (event) => {
+            if (this.socket.readyState !== WebSocket.OPEN) return;
+            const samples = resampler.process(event.inputBuffer.getChannelData(0));
+            const pcm = new Int16Array(samples.length);
+            for (let i = 0; i < samples.length; i++) {
+                pcm[i] = Math.max(-1, Math.min(1, samples[i])) * 0x7fff;
+            }
+            this.socket.send(pcm.buffer);
+        };
+        source.connect(this.processor);
+        this.processor.connect(this.audioContext.destination);
+    }
+
+    stop() {
+        if (this.processor) this.processor.disconnect();
+        if (this.audioContext) this.audioContext.close();
+        if (this.stream) this.stream.getTracks().forEach(track => track.stop());
+        if (this.socket && this.socket.readyState <= WebSocket.OPEN) this.socket.close();
+    }
+
+    handleMessage(message) {
+        if (message.data instanceof Blob) {
+            // Audio for the sentence announced by the preceding 'audio' event
+            this.assistant.enqueueAudio(new Blob([message.data], { type: 'audio/wav' }));
+            return;
+        }
+        
+        const event = JSON.parse(message.data);
+        if (event.type === 'speech_start') {
+            this.assistant.recordingIndicator.classList.add('active');
+        } else if (event.type === 'speech_end') {
+            this.assistant.recordingIndicator.classList.remove('active');
+        } else if (event.type === 'transcript') {
+            this.assistant.addMessage(event.text, true);
+            this.assistantText = null;
+        } else if (event.type === 'token') {
+            if (!this.assistantText) {
+                this.assistantText = this.assistant.addMessage('', false);
+            }
+            this.assistant.appendToMessage(this.assistantText, event.text);
+        } else if (event.type === 'error') {
+            console.error('Live session error:', event.error);
+        }
+    }
+}
+
 // Initialize the app when DOM is loaded
 document.addEventListener('DOMContentLoaded', () => {
     new VoiceAssistant();